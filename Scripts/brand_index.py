@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Persistent index of where brand values were written, for repeat renames
+Records, per file, the byte spans that hold the app name or bundle ID along
+with the template that produced them and the file's size, mtime and hash,
+so the next rename splices new values in without re-parsing the file and
+only files edited since then take the full update path
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from icon_export import write_if_changed
+from multi_replace import MultiReplacer
+from pbxproj import quote
+
+INDEX_NAME = ".brand-index.json"
+
+# Bump when templates or span kinds change meaning so every file is re-indexed
+INDEX_VERSION = 2
+
+# How a rendered template is written into its span
+KINDS = {
+    "text": lambda value: value,
+    "pbxproj": quote,  # A project.pbxproj string, quoted when Xcode would
+}
+
+def template_for(text, values):
+    """Turn ``text`` into a ``str.format`` template over ``values``
+
+    Each occurrence of a value becomes ``{key}``, longest match first (see
+    multi_replace), and literal braces are doubled. Later keys win when two
+    values are equal.
+    """
+    def escape(value):
+        return value.replace("{", "{{").replace("}", "}}")
+    replacer = MultiReplacer((escape(value), f"{{{key}}}") for key, value in values.items() if value)
+    return replacer.sub(escape(text))[0]
+
+def byte_spans(text, spans):
+    """Encode ``text`` as UTF-8 and move sorted character spans to byte offsets
+
+    ``spans`` are tuples starting with ``(start, end)``; anything after is
+    kept. Returns ``(data, spans)``.
+    """
+    data = text.encode("utf-8")
+    if len(data) == len(text):
+        return data, list(spans)
+    result = []
+    position = offset = 0
+    for start, end, *rest in spans:
+        offset += len(text[position:start].encode("utf-8"))
+        length = len(text[start:end].encode("utf-8"))
+        result.append((offset, offset + length, *rest))
+        offset += length
+        position = end
+    return data, result
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+class BrandIndex:
+    """Brand value spans per file, stored as ``INDEX_NAME`` under ``root``
+
+    ``values`` maps template keys (e.g. ``name`` and ``bundle``) to what the
+    recorded spans hold now. Each file entry keeps the ``[size, mtime_ns]``
+    stamp and SHA-256 of the file as written, and its spans as ``[start,
+    end, template, kind]`` byte offsets.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.path = self.root / INDEX_NAME
+        try:
+            with open(self.path, 'r') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            stored = {}
+        if stored.get("version") != INDEX_VERSION:
+            stored = {}
+        self.values = stored.get("values", {})
+        self.files = stored.get("files", {})
+
+    def _key(self, path):
+        return Path(os.path.relpath(path, self.root)).as_posix()
+
+    def is_current(self, path):
+        """Whether ``path`` still holds what was recorded for it
+
+        A matching size and mtime is trusted without reading the file; a
+        different mtime with the same size is settled by the hash, so a file
+        that was only touched stays indexed.
+        """
+        entry = self.files.get(self._key(path))
+        stamp = _stamp(path)
+        if entry is None or stamp is None or stamp[0] != entry["stamp"][0]:
+            return False
+        if stamp == entry["stamp"]:
+            return True
+        with open(path, 'rb') as f:
+            if hashlib.sha256(f.read()).hexdigest() != entry["sha256"]:
+                return False
+        entry["stamp"] = stamp
+        return True
+
+    def record(self, path, data, spans):
+        """Remember that ``path`` was just written with ``data``
+
+        ``spans`` are sorted ``(start, end, template, kind)`` byte spans.
+        """
+        self.files[self._key(path)] = {
+            "stamp": _stamp(path),
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "spans": [list(span) for span in spans],
+        }
+
+    def patch(self, path, values):
+        """Render every recorded span of ``path`` with ``values`` in place
+
+        Returns the number of spans, or None when the file is not indexed or
+        has changed since it was recorded and needs a full update.
+        """
+        if not self.is_current(path):
+            return None
+        entry = self.files[self._key(path)]
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        parts = []
+        spans = []
+        position = shift = 0
+        for start, end, template, kind in entry["spans"]:
+            replacement = KINDS[kind](template.format(**values)).encode("utf-8")
+            parts.append(data[position:start])
+            parts.append(replacement)
+            spans.append((start + shift, start + shift + len(replacement), template, kind))
+            shift += len(replacement) - (end - start)
+            position = end
+        parts.append(data[position:])
+
+        data = b"".join(parts)
+        write_if_changed(path, data)
+        self.record(path, data, spans)
+        return len(spans)
+
+    def save(self, values):
+        """Write the index with ``values`` as what its spans now hold"""
+        self.values = dict(values)
+        payload = {"version": INDEX_VERSION, "values": self.values, "files": self.files}
+        write_if_changed(self.path, json.dumps(payload, indent=2, sort_keys=True).encode())
+
+def main():
+    parser = argparse.ArgumentParser(description="Show a brand index and whether its files are current")
+    parser.add_argument("root", help="directory holding the index")
+    args = parser.parse_args()
+
+    index = BrandIndex(args.root)
+    if not index.files:
+        print(f"📭 No brand index in {args.root}")
+        return
+    for key, value in sorted(index.values.items()):
+        print(f"🏷️  {key}: {value}")
+    for name, entry in sorted(index.files.items()):
+        state = "✅ current" if index.is_current(index.root / name) else "⚠️  changed"
+        print(f"{state}  {name} ({len(entry['spans'])} spans)")
+
+if __name__ == "__main__":
+    main()
@@ -7,104 +7,152 @@ import sys
 import re
 from pathlib import Path
 
-def update_app_name(new_name, new_short_name=None):
-    """Update the app name in AppConfig.swift and Xcode project"""
+from brand_index import BrandIndex, byte_spans, template_for
+from icon_export import write_if_changed
+from pbxproj import PBXProject, rebase_bundle_ids
+
+# AppConfig.swift constants set from the new name, with the value template
+CONFIG_CONSTANTS = [
+    ("appName", "{name}"),
+    ("appShortName", "{short}"),
+    ("assistantName", "{name}"),
+    ("bundleIdBase", "{bundle}"),
+]
+
+PROJECT_ROOT = Path("/Users/andrewbierman/Code/prism")
+
+# Targets renamed along with the app target
+TARGET_SUFFIXES = ("", "Tests", "UITests")
+
+# The target name in an annotation comment: the whole comment, or the
+# quoted name at the end of a configuration list's comment
+COMMENT_NAME = re.compile(r' (?:[^"]*")?([^"]*)"? ')
+
+def update_config(content, values):
+    """Set AppConfig's name constants; returns ``(content, spans)``
+
+    ``spans`` are the ``(start, end, template, kind)`` character spans of
+    the values written, for the brand index.
+    """
+    for constant, template in CONFIG_CONSTANTS:
+        content = re.sub(
+            rf'static let {constant} = "[^"]*"',
+            f'static let {constant} = "{template.format(**values)}"',
+            content
+        )
 
-    config_path = Path("/Users/andrewbierman/Code/prism/Prysm/Constants/AppConfig.swift")
+    spans = []
+    for constant, template in CONFIG_CONSTANTS:
+        match = re.search(rf'static let {constant} = "([^"]*)"', content)
+        if match:
+            spans.append((match.start(1), match.end(1), template, "text"))
+    return content, sorted(spans)
+
+def update_project(project, values):
+    """Set the app's names and bundle IDs in a parsed project; returns the spans set
+
+    Targets are renamed from whatever the app target is called now, so
+    repeated renames keep working.
+    """
+    new_name = values["name"]
+    app_targets = project.targets("com.apple.product-type.application")
+    app_configs = {config for target_id in app_targets
+                   for config in project.target_configurations(target_id)}
+
+    # Update PRODUCT_NAME and CFBundleDisplayName of the app target
+    project.set_build_setting("PRODUCT_NAME", new_name, app_configs)
+    project.set_build_setting("INFOPLIST_KEY_CFBundleDisplayName", new_name, app_configs)
+
+    # Update PRODUCT_BUNDLE_IDENTIFIER; test bundles keep their suffixes
+    app_bundle_ids = project.build_settings("PRODUCT_BUNDLE_IDENTIFIER", app_configs)
+    if app_bundle_ids:
+        old_bundle_id = app_bundle_ids[0][1].value
+        rebase_bundle_ids(project, old_bundle_id, values["bundle"])
+
+    # Update target names, their comments (these show in Xcode UI),
+    # build configuration lists and TEST_TARGET_NAME
+    if app_targets:
+        old_name = project.objects[app_targets[0]]["name"].value
+        for suffix in TARGET_SUFFIXES:
+            project.rename_target(f"{old_name}{suffix}", f"{new_name}{suffix}")
+
+    # Templates only over name and bundle: the short name is often a prefix
+    # of the name and never written to the project
+    keys = {"name": new_name, "bundle": values["bundle"]}
+
+    def template(text):
+        # Target names are the name plus a known suffix; matching them whole
+        # keeps a name that also occurs in the suffix ("Test") out of it
+        for suffix in TARGET_SUFFIXES:
+            if text == f"{new_name}{suffix}":
+                return f"{{name}}{suffix}"
+        return template_for(text, keys)
+
+    spans = []
+    for start, end, text, value in project.edit_spans():
+        if value is not None:
+            spans.append((start, end, template(value), "pbxproj"))
+            continue
+        # Comments hold a target name, alone or quoted after boilerplate
+        # ("Build configuration list for PBXNativeTarget"), which must not
+        # be templated in case the name is one of its words
+        match = COMMENT_NAME.fullmatch(text)
+        if match:
+            spans.append((start + match.start(1), start + match.end(1), template(match.group(1)), "text"))
+    return spans
+
+def update_app_name(new_name, new_short_name=None, project_root=PROJECT_ROOT):
+    """Update the app name in AppConfig.swift and Xcode project
+
+    Where each name was written is kept in a brand index at the project
+    root (see brand_index); files unchanged since the last run are patched
+    at those spans instead of being parsed and rewritten.
+    """
+
+    project_root = Path(project_root)
+    config_path = project_root / "Prysm/Constants/AppConfig.swift"
 
     if not config_path.exists():
         print(f"❌ AppConfig.swift not found at {config_path}")
         return False
 
-    with open(config_path, 'r') as f:
-        content = f.read()
-
-    # Update app name
-    content = re.sub(
-        r'static let appName = "[^"]*"',
-        f'static let appName = "{new_name}"',
-        content
-    )
-
-    # Update short name if provided
-    if new_short_name:
-        content = re.sub(
-            r'static let appShortName = "[^"]*"',
-            f'static let appShortName = "{new_short_name}"',
-            content
-        )
-    else:
-        # Use first word of name as short name
-        short = new_name.split()[0]
-        content = re.sub(
-            r'static let appShortName = "[^"]*"',
-            f'static let appShortName = "{short}"',
-            content
-        )
-
-    # Update assistant name to match
-    content = re.sub(
-        r'static let assistantName = "[^"]*"',
-        f'static let assistantName = "{new_name}"',
-        content
-    )
-
-    # Update bundle ID base (make it safe for bundle IDs)
+    # Use first word of name as short name if not provided; make the
+    # bundle ID base safe for bundle IDs
     safe_bundle_name = new_name.lower().replace(" ", "-").replace("'", "")
-    content = re.sub(
-        r'static let bundleIdBase = "[^"]*"',
-        f'static let bundleIdBase = "andrewbierman.{safe_bundle_name}"',
-        content
-    )
-
-    with open(config_path, 'w') as f:
-        f.write(content)
+    values = {
+        "name": new_name,
+        "short": new_short_name or new_name.split()[0],
+        "bundle": f"andrewbierman.{safe_bundle_name}",
+    }
+    index = BrandIndex(project_root)
+
+    patched = index.patch(config_path, values)
+    if patched is None:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            content, spans = update_config(f.read(), values)
+        data, spans = byte_spans(content, spans)
+        write_if_changed(config_path, data)
+        index.record(config_path, data, spans)
+    else:
+        print(f"⚡ Patched {patched} indexed values in AppConfig.swift")
 
     # Also update the Xcode project file
-    project_path = Path("/Users/andrewbierman/Code/prism/Prysm.xcodeproj/project.pbxproj")
+    project_path = project_root / "Prysm.xcodeproj/project.pbxproj"
     if project_path.exists():
-        with open(project_path, 'r') as f:
-            project_content = f.read()
-
-        # Update PRODUCT_NAME
-        project_content = re.sub(
-            r'PRODUCT_NAME = "[^"]*"',
-            f'PRODUCT_NAME = "{new_name}"',
-            project_content
-        )
-
-        # Update CFBundleDisplayName
-        project_content = re.sub(
-            r'INFOPLIST_KEY_CFBundleDisplayName = "[^"]*"',
-            f'INFOPLIST_KEY_CFBundleDisplayName = "{new_name}"',
-            project_content
-        )
-
-        # Update PRODUCT_BUNDLE_IDENTIFIER
-        project_content = re.sub(
-            r'PRODUCT_BUNDLE_IDENTIFIER = "[^"]*"',
-            f'PRODUCT_BUNDLE_IDENTIFIER = "andrewbierman.{safe_bundle_name}"',
-            project_content
-        )
-
-        # Update target names in comments (these show in Xcode UI)
-        project_content = project_content.replace('/* Prism */', f'/* {new_name} */')
-        project_content = project_content.replace('/* PrismTests */', f'/* {new_name}Tests */')
-        project_content = project_content.replace('/* PrismUITests */', f'/* {new_name}UITests */')
-
-        # Update build configuration lists
-        project_content = project_content.replace('"Prism"', f'"{new_name}"')
-        project_content = project_content.replace('"PrismTests"', f'"{new_name}Tests"')
-        project_content = project_content.replace('"PrismUITests"', f'"{new_name}UITests"')
-
-        # Update TEST_TARGET_NAME
-        project_content = project_content.replace('TEST_TARGET_NAME = Prism;', f'TEST_TARGET_NAME = "{new_name}";')
-
-        with open(project_path, 'w') as f:
-            f.write(project_content)
+        patched = index.patch(project_path, values)
+        if patched is None:
+            project = PBXProject.load(project_path)
+            spans = update_project(project, values)
+            data, spans = byte_spans(project.serialize(), spans)
+            write_if_changed(project_path, data)
+            index.record(project_path, data, spans)
+        else:
+            print(f"⚡ Patched {patched} indexed values in project.pbxproj")
 
         print(f"✅ Updated Xcode project settings")
 
+    index.save(values)
+
     print(f"✅ Updated app name to: {new_name}")
     if new_short_name:
         print(f"   Short name: {new_short_name}")
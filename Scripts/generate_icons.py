@@ -5,73 +5,55 @@ Creates all required sizes for iOS and macOS
 """
 
 import os
+import argparse
 import subprocess
 from pathlib import Path
 
-# Icon sizes needed for iOS and macOS
-icon_sizes = {
-    # iOS - Universal
-    "ios_universal": [(1024, 1024)],
-
-    # macOS
-    "mac": [
-        (16, 16),
-        (32, 16),    # 16x16@2x
-        (32, 32),
-        (64, 32),    # 32x32@2x
-        (128, 128),
-        (256, 128),  # 128x128@2x
-        (256, 256),
-        (512, 256),  # 256x256@2x
-        (512, 512),
-        (1024, 512), # 512x512@2x
-    ]
-}
+from icon_specs import APP_ICON_SPECS, select_specs, spec_name, spec_pixels
 
-def create_icon_with_text():
-    """Create a simple icon using ImageMagick or PIL"""
-    try:
-        from PIL import Image, ImageDraw, ImageFont
-        import numpy as np
+# Icon slots needed for iOS and macOS
+icon_slots = select_specs(APP_ICON_SPECS, "universal", "mac")
 
-        # Create base icon at 1024x1024
-        size = 1024
-        img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
+def create_icon_with_text(size=1024, supersample=1):
+    """Create a simple icon using ImageMagick or PIL
 
-        # Create gradient background
-        for y in range(size):
-            # Purple to pink gradient
-            r = int(102 + (153 - 102) * (y / size))  # Purple to pink red channel
-            g = int(51 + (102 - 51) * (y / size))     # Purple to pink green channel
-            b = int(204 - (204 - 153) * (y / size))  # Purple to pink blue channel
-            draw.rectangle([(0, y), (size, y+1)], fill=(r, g, b, 255))
+    The icon is drawn natively at ``size`` on a canvas ``supersample`` times
+    larger, which is box-reduced for anti-aliased edges.
+    """
+    try:
+        from PIL import ImageDraw
+        from icon_gradients import gradient_image
+        from icon_native import finish_icon, stroke_width
+
+        # Create base icon at 1024x1024 unless another size was requested
+        canvas = size * supersample
+
+        # Create gradient background (purple to pink)
+        img = gradient_image(canvas, [
+            (0.0, (102, 51, 204)),
+            (1.0, (153, 102, 153)),
+        ], kind="vertical")
+        draw = ImageDraw.Draw(img)
 
         # Draw prism shape
         prism_points = [
-            (size * 0.5, size * 0.2),   # Top
-            (size * 0.25, size * 0.7),  # Bottom left
-            (size * 0.75, size * 0.7),  # Bottom right
+            (canvas * 0.5, canvas * 0.2),   # Top
+            (canvas * 0.25, canvas * 0.7),  # Bottom left
+            (canvas * 0.75, canvas * 0.7),  # Bottom right
         ]
-        draw.polygon(prism_points, fill=(255, 255, 255, 200), outline=(255, 255, 255, 255), width=8)
+        draw.polygon(prism_points, fill=(255, 255, 255, 200), outline=(255, 255, 255, 255),
+                     width=stroke_width(8, canvas, supersample))
 
         # Add some inner lines for 3D effect
-        draw.line([(size * 0.5, size * 0.2), (size * 0.5, size * 0.8)], fill=(255, 255, 255, 150), width=4)
-        draw.line([(size * 0.25, size * 0.7), (size * 0.5, size * 0.8)], fill=(255, 255, 255, 150), width=4)
-        draw.line([(size * 0.75, size * 0.7), (size * 0.5, size * 0.8)], fill=(255, 255, 255, 150), width=4)
+        draw.line([(canvas * 0.5, canvas * 0.2), (canvas * 0.5, canvas * 0.8)], fill=(255, 255, 255, 150),
+                  width=stroke_width(4, canvas, supersample))
+        draw.line([(canvas * 0.25, canvas * 0.7), (canvas * 0.5, canvas * 0.8)], fill=(255, 255, 255, 150),
+                  width=stroke_width(4, canvas, supersample))
+        draw.line([(canvas * 0.75, canvas * 0.7), (canvas * 0.5, canvas * 0.8)], fill=(255, 255, 255, 150),
+                  width=stroke_width(4, canvas, supersample))
 
-        # Round corners for iOS
-        # Create a mask for rounded corners
-        mask = Image.new('L', (size, size), 0)
-        mask_draw = ImageDraw.Draw(mask)
-        corner_radius = int(size * 0.2237)  # iOS corner radius ratio
-        mask_draw.rounded_rectangle([(0, 0), (size, size)], corner_radius, fill=255)
-
-        # Apply mask
-        output = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-        output.paste(img, (0, 0), mask)
-
-        return output
+        # Reduce to the output size and round corners for iOS
+        return finish_icon(img, size, supersample)
 
     except ImportError:
         print("PIL not found. Trying ImageMagick...")
@@ -104,43 +86,48 @@ def create_icon_with_imagemagick():
 
     return None
 
-def resize_icon(source_image, sizes_dict, output_dir):
-    """Resize the source icon to all required sizes"""
+def resize_icon(source_image, specs, output_dir, supersample=None):
+    """Resize the source icon to all required sizes
+
+    ``source_image`` may be a path, a rendered image, or a design function
+    such as ``create_icon_with_text`` that is rendered natively at each size.
+    Images are downscaled once per unique size through a mipmap pyramid, and
+    each slot in ``specs`` is named like ``AppIcon-16x16@2x.png``.
+    """
     from PIL import Image
+    from icon_export import IconExporter
+    from icon_native import iter_sizes
+    from icon_png import PNGOptimizer
+    from icon_pyramid import iter_pyramid
 
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    if isinstance(source_image, str):
-        img = Image.open(source_image)
+    pixel_sizes = [spec_pixels(spec) for spec in specs]
+    if callable(source_image):
+        levels = iter_sizes(source_image, pixel_sizes, supersample)
     else:
-        img = source_image
-
-    for category, sizes in sizes_dict.items():
-        for size_tuple in sizes:
-            if len(size_tuple) == 2:
-                width, name_size = size_tuple
-                height = width
-            else:
-                width, height, name_size = size_tuple
-
-            resized = img.resize((width, height), Image.Resampling.LANCZOS)
-
-            if category == "ios_universal":
-                filename = f"AppIcon-{width}x{height}.png"
-            else:
-                # macOS naming convention
-                if width == name_size:
-                    filename = f"AppIcon-{name_size}x{name_size}.png"
-                else:
-                    scale = width // name_size
-                    filename = f"AppIcon-{name_size}x{name_size}@{scale}x.png"
-
-            output_path = output_dir / filename
-            resized.save(output_path, "PNG")
-            print(f"Created: {filename}")
+        img = Image.open(source_image) if isinstance(source_image, str) else source_image
+        levels = iter_pyramid(img, pixel_sizes)
+
+    # Encode each size on the export pool while the next one is produced,
+    # with the PNG settings that make it smallest
+    with IconExporter(encoder=PNGOptimizer()) as exporter:
+        for size, resized in levels:
+            paths = [output_dir / spec_name(spec) for spec in specs if spec_pixels(spec) == size]
+            exporter.submit(resized, paths)
+
+    for output_path, size, detail in exporter.written:
+        print(f"Created: {output_path.name} ({size:,} bytes; {detail})")
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate Prism app icons")
+    parser.add_argument("--native", action="store_true",
+                        help="render every size natively instead of resizing the 1024 base icon")
+    parser.add_argument("--supersample", type=int,
+                        help="supersampling factor for --native (default: chosen per size)")
+    args = parser.parse_args()
+
     print("🎨 Generating Prism App Icons...")
 
     # Try to create the icon
@@ -156,7 +143,8 @@ def main():
         print(f"✅ Created base icon: {base_icon_path}")
 
         # Generate all sizes
-        resize_icon(icon, icon_sizes, base_path)
+        resize_icon(create_icon_with_text if args.native else icon, icon_slots, base_path,
+                    args.supersample)
 
         print("\n📦 Icon generation complete!")
         print(f"📁 Icons saved to: {base_path}")
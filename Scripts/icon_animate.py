@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Animated icon output for onboarding screens
+Renders parametric frames lazily from a generator and streams them to APNG,
+GIF or animated WebP, writing only the rectangle that changed since the
+previous frame, so long animations never hold more than two frames in memory
+"""
+
+import argparse
+import io
+import math
+import struct
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from icon_scene import load_scene, render_scene, with_overrides
+from icon_tiles import PNG_SIGNATURE, png_chunk, up_filter
+
+# Peak height of the thinking-dot bounce, in 1024 px reference pixels
+DOT_BOUNCE = 36
+
+def frame_phases(count):
+    """Yield ``count`` evenly spaced animation phases in [0, 1)"""
+    for index in range(count):
+        yield index / count
+
+def _find_op(scene, layer_id, op_id):
+    for layer in scene["layers"]:
+        if layer.get("id") == layer_id:
+            for op in layer.get("ops", []):
+                if op.get("id") == op_id:
+                    return op
+    raise ValueError(f"Scene {scene.get('name')} has no op {layer_id}.{op_id}")
+
+def prism_frames(count=120, size=1024, supersample=1, scene="geometric_prism"):
+    """Yield frames of the prism with its back face circling the front face
+
+    The back-face offset keeps its length from the scene and rotates once
+    over the animation, so the last frame loops into the first.
+    """
+    scene = load_scene(scene)
+    dx, dy = _find_op(scene, "artwork", "prism")["offset"]
+    radius, start = math.hypot(dx, dy), math.atan2(dy, dx)
+
+    for phase in frame_phases(count):
+        angle = start + 2 * math.pi * phase
+        offset = [radius * math.cos(angle), radius * math.sin(angle)]
+        frame = with_overrides(scene, {"artwork.prism.offset": offset})
+        yield render_scene(frame, size, supersample, persist=False)
+
+def thinking_frames(count=60, size=1024, supersample=1, scene="ai_chat", dots=("dot1", "dot2", "dot3")):
+    """Yield frames of the chat bubble with its dots bouncing in sequence"""
+    scene = load_scene(scene)
+    centers = [_find_op(scene, "artwork", dot)["center"] for dot in dots]
+
+    for phase in frame_phases(count):
+        overrides = {}
+        for index, (dot, (x, y)) in enumerate(zip(dots, centers)):
+            # Each dot hops for a third of the cycle, a sixth after the previous one
+            local = (phase - index / 6) % 1
+            lift = math.sin(3 * math.pi * local) if local < 1 / 3 else 0.0
+            overrides[f"artwork.{dot}.center"] = [x, y - DOT_BOUNCE * lift]
+        yield render_scene(with_overrides(scene, overrides), size, supersample, persist=False)
+
+ANIMATIONS = {
+    "prism": prism_frames,
+    "thinking": thinking_frames,
+}
+
+def changed_box(previous, current):
+    """Return the ``(x0, y0, x1, y1)`` box of pixels that differ, or None"""
+    if previous is None:
+        return (0, 0, current.shape[1], current.shape[0])
+    changed = np.any(previous != current, axis=2)
+    rows = np.flatnonzero(changed.any(axis=1))
+    if not rows.size:
+        return None
+    cols = np.flatnonzero(changed.any(axis=0))
+    return (int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1)
+
+class AnimationWriter:
+    """Base class for streaming animation encoders
+
+    Subclasses write the container header in ``_start`` and one frame
+    rectangle in ``_write_frame``; this class keeps only the previous frame
+    and works out which rectangle changed.
+    """
+
+    def __init__(self, path, duration=40, loop=0):
+        self.path = Path(path)
+        self.duration = duration
+        self.loop = loop
+        self.width = self.height = None
+        self.frames = 0
+        self.pixels_written = 0
+        self._file = open(self.path, 'wb')
+        self._previous = None
+
+    def add_frame(self, image, duration=None):
+        """Append a frame, encoding only what changed since the previous one"""
+        pixels = np.asarray(image.convert('RGBA') if image.mode != 'RGBA' else image)
+        if self.width is None:
+            self.height, self.width = pixels.shape[:2]
+            self._start()
+        elif pixels.shape[:2] != (self.height, self.width):
+            raise ValueError(f"Frame is {pixels.shape[1]}x{pixels.shape[0]}, "
+                             f"animation is {self.width}x{self.height}")
+
+        # Formats need a frame per tick, so an unchanged frame repeats one pixel
+        box = changed_box(self._previous, pixels) or (0, 0, 1, 1)
+        box = self._write_frame(pixels, box, self.duration if duration is None else duration)
+
+        self.pixels_written += (box[2] - box[0]) * (box[3] - box[1])
+        self.frames += 1
+        self._previous = pixels
+
+    def _start(self):
+        raise NotImplementedError
+
+    def _write_frame(self, pixels, box, duration):
+        raise NotImplementedError
+
+    def _finish(self):
+        raise NotImplementedError
+
+    def close(self):
+        if self._file.closed:
+            return
+        try:
+            if self.frames == 0:
+                raise ValueError("An animation needs at least one frame")
+            self._finish()
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+class APNGWriter(AnimationWriter):
+    """Animated PNG; changed rectangles replace the pixels beneath them"""
+
+    def __init__(self, path, duration=40, loop=0, compress_level=6):
+        super().__init__(path, duration, loop)
+        self.compress_level = compress_level
+        self._sequence = 0
+        self._actl_offset = None
+
+    def _start(self):
+        self._file.write(PNG_SIGNATURE)
+        # 8-bit depth, color type 6 (RGBA), deflate, adaptive filtering, no interlace
+        self._file.write(png_chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 6, 0, 0, 0)))
+        # The frame count is patched in on close
+        self._actl_offset = self._file.tell()
+        self._file.write(png_chunk(b"acTL", struct.pack(">II", 0, self.loop)))
+
+    def _write_frame(self, pixels, box, duration):
+        x0, y0, x1, y1 = box
+        rows = np.ascontiguousarray(pixels[y0:y1, x0:x1]).reshape(y1 - y0, -1)
+        data = zlib.compress(up_filter(rows, np.zeros(rows.shape[1], dtype=np.uint8)).tobytes(),
+                             self.compress_level)
+
+        # Dispose: none; blend: source, so transparent pixels overwrite too
+        self._file.write(png_chunk(b"fcTL", struct.pack(
+            ">IIIIIHHBB", self._sequence, x1 - x0, y1 - y0, x0, y0, duration, 1000, 0, 0)))
+        self._sequence += 1
+        if self.frames == 0:
+            self._file.write(png_chunk(b"IDAT", data))
+        else:
+            self._file.write(png_chunk(b"fdAT", struct.pack(">I", self._sequence) + data))
+            self._sequence += 1
+        return box
+
+    def _finish(self):
+        self._file.write(png_chunk(b"IEND", b""))
+        self._file.seek(self._actl_offset)
+        self._file.write(png_chunk(b"acTL", struct.pack(">II", self.frames, self.loop)))
+
+def _gif_image(pixels, matte):
+    """Encode RGBA pixels as a single GIF image and return its color table and data
+
+    GIF transparency is all or nothing, so partly transparent pixels are
+    flattened onto ``matte`` and fully transparent ones use index 255. Colors
+    are quantized per image.
+    """
+    alpha = pixels[..., 3:4].astype(np.float32) / 255
+    flat = pixels[..., :3] * alpha + np.asarray(matte, dtype=np.float32) * (1 - alpha)
+    paletted = Image.fromarray(np.round(flat).astype(np.uint8), 'RGB').quantize(255, dither=Image.Dither.NONE)
+    indices = np.array(paletted)
+    indices[pixels[..., 3] == 0] = 255
+    palette = (paletted.getpalette() or [])[:255 * 3]
+    palette += [0] * (256 * 3 - len(palette))
+
+    frame = Image.fromarray(indices, 'P')
+    frame.putpalette(palette)
+    buffer = io.BytesIO()
+    frame.save(buffer, "GIF", transparency=255, optimize=False, interlace=False)
+    gif = buffer.getvalue()
+
+    # Logical screen descriptor, then the global color table Pillow wrote
+    flags = gif[10]
+    table_size = 3 << ((flags & 7) + 1) if flags & 0x80 else 0
+    table, position = gif[13:13 + table_size], 13 + table_size
+
+    while gif[position] == 0x21:  # Skip extension blocks
+        position += 2
+        while gif[position]:
+            position += gif[position] + 1
+        position += 1
+    if gif[position] != 0x2C:
+        raise ValueError("Unexpected GIF layout from the encoder")
+
+    # Image data follows the 10-byte image descriptor, up to the trailer
+    return flags & 7, table, gif[position + 10:-1]
+
+def _union(a, b):
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+class GIFWriter(AnimationWriter):
+    """Animated GIF with a local color table per changed rectangle
+
+    Rectangles are drawn over the previous frame. When pixels turn fully
+    transparent, the previous frame's rectangle is widened over them and
+    cleared after it is shown, and the new rectangle covers it all. Partly
+    transparent pixels are flattened onto ``matte``.
+    """
+
+    def __init__(self, path, duration=40, loop=0, matte=(255, 255, 255)):
+        super().__init__(path, duration, loop)
+        self.matte = matte
+        self._pending = None
+
+    def _start(self):
+        self._file.write(b"GIF89a" + struct.pack("<HHBBB", self.width, self.height, 0, 0, 0))
+        self._file.write(b"\x21\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", self.loop) + b"\x00")
+
+    def _flush(self, disposal):
+        box, duration, (bits, table, data) = self._pending
+        x0, y0, x1, y1 = box
+        # Graphic control: disposal method, transparency, delay in centiseconds
+        self._file.write(struct.pack("<BBBBHBB", 0x21, 0xF9, 4, disposal << 2 | 1,
+                                     round(duration / 10), 255, 0))
+        self._file.write(struct.pack("<BHHHHB", 0x2C, x0, y0, x1 - x0, y1 - y0, 0x80 | bits))
+        self._file.write(table)
+        self._file.write(data)
+        self._pending = None
+
+    def _write_frame(self, pixels, box, duration):
+        if self._pending is not None:
+            cleared = (self._previous[..., 3] > 0) & (pixels[..., 3] == 0)
+            if cleared.any():
+                # Disposal 2 only clears the pending frame's own rectangle, and
+                # pixels painted by earlier frames may lie outside it: widen the
+                # pending frame over every cleared pixel (it repaints them as
+                # they are now), clear that, and repaint it with the new frame
+                rows, columns = np.nonzero(cleared)
+                previous, previous_duration, _ = self._pending
+                widened = _union(previous, (int(columns.min()), int(rows.min()),
+                                            int(columns.max()) + 1, int(rows.max()) + 1))
+                if widened != previous:
+                    x0, y0, x1, y1 = widened
+                    self._pending = (widened, previous_duration,
+                                     _gif_image(self._previous[y0:y1, x0:x1], self.matte))
+                box = _union(box, widened)
+                self._flush(2)
+            else:
+                self._flush(1)
+
+        x0, y0, x1, y1 = box
+        self._pending = (box, duration, _gif_image(pixels[y0:y1, x0:x1], self.matte))
+        return box
+
+    def _finish(self):
+        self._flush(1)
+        self._file.write(b";")
+
+def _riff_chunk(fourcc, data):
+    padding = b"\x00" if len(data) % 2 else b""
+    return fourcc + struct.pack("<I", len(data)) + data + padding
+
+def _webp_bitstream(pixels, lossless, quality):
+    """Encode RGBA pixels as a still WebP and return its ALPH/VP8/VP8L chunks"""
+    buffer = io.BytesIO()
+    Image.fromarray(pixels, 'RGBA').save(buffer, "WEBP", lossless=lossless, quality=quality)
+    webp = buffer.getvalue()
+
+    chunks, position = [], 12
+    while position < len(webp):
+        fourcc = webp[position:position + 4]
+        length = struct.unpack("<I", webp[position + 4:position + 8])[0]
+        if fourcc in (b"ALPH", b"VP8 ", b"VP8L"):
+            chunks.append(_riff_chunk(fourcc, webp[position + 8:position + 8 + length]))
+        position += 8 + length + (length & 1)
+    return b"".join(chunks)
+
+def _uint24(value):
+    return struct.pack("<I", value)[:3]
+
+class WebPWriter(AnimationWriter):
+    """Animated WebP; changed rectangles replace the pixels beneath them"""
+
+    def __init__(self, path, duration=40, loop=0, lossless=True, quality=80):
+        super().__init__(path, duration, loop)
+        self.lossless = lossless
+        self.quality = quality
+
+    def _start(self):
+        # The RIFF size is patched in on close
+        self._file.write(b"RIFF\x00\x00\x00\x00WEBP")
+        # Animation and alpha flags, then canvas size minus one
+        self._file.write(_riff_chunk(b"VP8X", bytes([0x12, 0, 0, 0])
+                                     + _uint24(self.width - 1) + _uint24(self.height - 1)))
+        self._file.write(_riff_chunk(b"ANIM", struct.pack("<IH", 0, self.loop)))
+
+    def _write_frame(self, pixels, box, duration):
+        # Frame offsets are stored halved, so they must be even
+        x0, y0, x1, y1 = box[0] & ~1, box[1] & ~1, box[2], box[3]
+        bitstream = _webp_bitstream(np.ascontiguousarray(pixels[y0:y1, x0:x1]),
+                                    self.lossless, self.quality)
+        header = (_uint24(x0 // 2) + _uint24(y0 // 2) + _uint24(x1 - x0 - 1) + _uint24(y1 - y0 - 1)
+                  + _uint24(duration) + bytes([0x02]))  # Do not blend, do not dispose
+        self._file.write(_riff_chunk(b"ANMF", header + bitstream))
+        return (x0, y0, x1, y1)
+
+    def _finish(self):
+        size = self._file.tell() - 8
+        self._file.seek(4)
+        self._file.write(struct.pack("<I", size))
+
+WRITERS = {
+    ".png": APNGWriter,
+    ".apng": APNGWriter,
+    ".gif": GIFWriter,
+    ".webp": WebPWriter,
+}
+
+def open_animation(path, duration=40, loop=0, **options):
+    """Open a streaming writer for ``path``, picking the format from its suffix"""
+    suffix = Path(path).suffix.lower()
+    if suffix not in WRITERS:
+        raise ValueError(f"Unsupported animation format: {suffix} (use {', '.join(WRITERS)})")
+    return WRITERS[suffix](path, duration, loop, **options)
+
+def save_animation(frames, path, duration=40, loop=0, **options):
+    """Stream ``frames`` (any iterable of images) into an animation file
+
+    Returns the writer, whose ``frames`` and ``pixels_written`` describe
+    how much the frame differencing saved.
+    """
+    with open_animation(path, duration, loop, **options) as writer:
+        for frame in frames:
+            writer.add_frame(frame)
+    return writer
+
+def main():
+    parser = argparse.ArgumentParser(description="Render an animated icon")
+    parser.add_argument("animation", choices=sorted(ANIMATIONS), help="animation to render")
+    parser.add_argument("-o", "--output", help="output .apng/.png, .gif or .webp (default: <animation>.apng)")
+    parser.add_argument("--frames", type=int, help="number of frames (default: one loop)")
+    parser.add_argument("--fps", type=float, default=30, help="frames per second")
+    parser.add_argument("--size", type=int, default=1024, help="output size in pixels")
+    parser.add_argument("--supersample", type=int, default=1, help="supersampling factor")
+    args = parser.parse_args()
+
+    output = args.output or f"{args.animation}.apng"
+    options = {"size": args.size, "supersample": args.supersample}
+    if args.frames:
+        options["count"] = args.frames
+
+    print(f"🎞️  Rendering {args.animation} animation to {output}...")
+    start = time.perf_counter()
+    writer = save_animation(ANIMATIONS[args.animation](**options), output, round(1000 / args.fps))
+    full = writer.frames * writer.width * writer.height
+    print(f"✅ {writer.frames} frames in {time.perf_counter() - start:.1f}s, "
+          f"{writer.pixels_written / full:.0%} of pixels encoded, "
+          f"{Path(output).stat().st_size / 1024:.0f} KB")
+
+if __name__ == "__main__":
+    main()
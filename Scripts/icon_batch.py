@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Batch renderer for icon design variants
+Renders scene variants across a process pool; pixels come back through a
+shared-memory buffer instead of pickled images
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from icon_resample import resample_table
+from icon_scene import render_scene, with_overrides
+
+CHANNELS = 4  # Every render is RGBA
+
+def prism_variant(scene="geometric_prism", offset=None, scale=None, palette=None, name=None):
+    """Describe a prism variant by back-face offset, prism scale and palette
+
+    ``offset`` is the back triangle offset in prism units, ``scale`` the
+    prism size in 1024 px reference pixels, and ``palette`` a list of
+    background colors spread evenly across the gradient (a single color
+    fills it solid).
+    """
+    overrides = {}
+    if offset is not None:
+        overrides["artwork.prism.offset"] = list(offset)
+    if scale is not None:
+        overrides["artwork.prism.scale"] = scale
+    if palette is not None:
+        if not palette:
+            raise ValueError("palette needs at least one color")
+        if len(palette) == 1:
+            palette = [palette[0], palette[0]]
+        last = len(palette) - 1
+        stops = [[index / last, list(color)] for index, color in enumerate(palette)]
+        overrides["artwork.background.stops"] = stops
+    return {"scene": scene, "overrides": overrides, "name": name}
+
+def _render_into(shm_name, index, variant, size, supersample):
+    """Worker: render one variant straight into its slot of the shared buffer"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        scene = with_overrides(variant["scene"], variant.get("overrides", {}))
+        image = render_scene(scene, size, supersample)
+        frame_bytes = size * size * CHANNELS
+        frame = np.ndarray((size, size, CHANNELS), dtype=np.uint8,
+                           buffer=shm.buf, offset=index * frame_bytes)
+        frame[...] = np.asarray(image)
+        del frame  # Release the buffer export before closing
+    finally:
+        shm.close()
+    return index
+
+def render_variants(variants, size=1024, supersample=1, workers=None):
+    """Render every variant across a process pool and return a list of images
+
+    Each worker writes its pixels into one shared-memory block sized for the
+    whole batch, so only the variant description and its index cross the
+    process boundary. ``workers`` defaults to the CPU count.
+    """
+    if not variants:
+        return []
+
+    frame_bytes = size * size * CHANNELS
+    shm = shared_memory.SharedMemory(create=True, size=frame_bytes * len(variants))
+    try:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=min(workers, len(variants))) as executor:
+            futures = [
+                executor.submit(_render_into, shm.name, index, variant, size, supersample)
+                for index, variant in enumerate(variants)
+            ]
+            for future in as_completed(futures):
+                future.result()  # Surface worker errors
+
+        frames = np.ndarray((len(variants), size, size, CHANNELS), dtype=np.uint8, buffer=shm.buf)
+        images = [Image.fromarray(frame.copy(), 'RGBA') for frame in frames]
+        del frames
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return images
+
+def load_variants(path):
+    """Load a JSON list of variants; prism entries may use offset/scale/palette"""
+    with open(path, 'r') as f:
+        entries = json.load(f)
+
+    variants = []
+    for entry in entries:
+        if "overrides" in entry:
+            variants.append(entry)
+        else:
+            variants.append(prism_variant(**entry))
+    return variants
+
+def main():
+    parser = argparse.ArgumentParser(description="Render icon variants in parallel")
+    parser.add_argument("variants", help="JSON list of variants")
+    parser.add_argument("-o", "--output-dir", default=str(Path.home() / "Desktop" / "PrismAppIcon_Variants"))
+    parser.add_argument("--size", type=int, default=1024, help="output size in pixels")
+    parser.add_argument("--supersample", type=int, default=1, help="supersampling factor")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--sizes", help="comma-separated smaller sizes to export for every variant")
+    args = parser.parse_args()
+
+    variants = load_variants(args.variants)
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f"🎨 Rendering {len(variants)} variants...")
+    start = time.perf_counter()
+    images = render_variants(variants, args.size, args.supersample, args.workers)
+    elapsed = time.perf_counter() - start
+
+    # Every variant shares the premultiplied copy and cached kernels per size
+    sizes = [int(size) for size in args.sizes.split(",")] if args.sizes else []
+    table = resample_table(images, sizes)
+
+    for index, (variant, image) in enumerate(zip(variants, images)):
+        name = variant.get("name") or f"variant-{index:03d}"
+        image.save(output_dir / f"{name}.png", "PNG")
+        print(f"Created: {name}.png")
+        for size in sizes:
+            table[size][index].save(output_dir / f"{name}-{size}.png", "PNG")
+            print(f"Created: {name}-{size}.png")
+
+    print(f"✅ {len(images)} variants in {elapsed:.2f}s ({len(images) / elapsed:.1f}/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Two-tier raster cache for the icon renderers
+Keeps recently used layer images in memory (LRU, bounded by bytes) and
+persists them on disk so unchanged layers survive between runs
+"""
+
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+from PIL import Image
+
+# Persisted tier; set PRYSM_ICON_CACHE to move it, or to "" to disable it
+CACHE_ROOT = os.environ.get(
+    "PRYSM_ICON_CACHE",
+    str(Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "prysm-icons"),
+)
+
+# Fraction of ``disk_limit`` freed when the disk tier is trimmed
+TRIM_SLACK = 0.1
+
+class RasterCache:
+    """Memory + disk cache of images keyed by content hashes
+
+    ``memory_limit`` and ``disk_limit`` are in bytes; the least recently used
+    entries are evicted first in both tiers. Disk entries are PNGs written
+    with fast compression and renamed into place, so readers never see a
+    partial file.
+    """
+
+    def __init__(self, name, memory_limit=256 * 1024 * 1024, disk_limit=1024 * 1024 * 1024):
+        self.name = name
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+        self.directory = Path(CACHE_ROOT) / name if CACHE_ROOT else None
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self._entries = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = None  # Persisted tier size, measured on first store
+
+    def _path(self, key):
+        return self.directory / f"{key}.png"
+
+    def _remember(self, key, image):
+        size = image.width * image.height * len(image.getbands())
+        if size > self.memory_limit:
+            return
+        self._entries[key] = (image, size)
+        self._memory_bytes += size
+        while self._memory_bytes > self.memory_limit:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._memory_bytes -= evicted
+
+    def _load(self, key):
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with Image.open(path) as cached:
+                cached.load()
+                image = cached.copy()
+            os.utime(path)  # Mark as recently used for disk eviction
+            return image
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, key, image):
+        if self.directory is None:
+            return
+        path = self._path(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            image.save(temp_path, "PNG", compress_level=1)
+            size = temp_path.stat().st_size
+            try:
+                replaced = path.stat().st_size
+            except OSError:
+                replaced = 0
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not cache layer {path.name}: {e}")
+            return
+
+        # Keep a running total rather than rescanning the directory per store;
+        # it is measured once, then corrected whenever the disk tier is trimmed
+        if self._disk_bytes is None:
+            self._disk_bytes = self._scan_disk()[1]
+        else:
+            self._disk_bytes += size - replaced
+        if self._disk_bytes > self.disk_limit:
+            self._trim_disk()
+
+    def _scan_disk(self):
+        entries = []
+        for path in self.directory.glob("*.png"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries, sum(size for _, size, _ in entries)
+
+    def _trim_disk(self):
+        # Trim below the limit so a full cache is rescanned only once per
+        # TRIM_SLACK of its size written, not on every store
+        entries, total = self._scan_disk()
+        target = self.disk_limit * (1 - TRIM_SLACK)
+        if total > self.disk_limit:
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+                total -= size
+        self._disk_bytes = total
+
+    def get(self, key, build, persist=True):
+        """Return the image cached under ``key``, building and storing it on a miss
+
+        The returned image is shared with the cache and must not be modified.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return self._entries[key][0]
+
+        image = self._load(key) if persist else None
+        if image is not None:
+            self.stats["disk_hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            image = build()
+            if persist:
+                self._store(key, image)
+
+        self._remember(key, image)
+        return image
+
+    def clear(self, disk=False):
+        """Drop the in-memory entries, and the persisted ones too if ``disk``"""
+        self._entries.clear()
+        self._memory_bytes = 0
+        if disk and self.directory is not None and self.directory.exists():
+            for path in self.directory.glob("*.png"):
+                path.unlink()
+            self._disk_bytes = None
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Pipelined PNG export for icon sets
+Encodes and writes images on a bounded thread pool while the caller keeps
+resizing or rendering the next size; Pillow's encoders release the GIL, so
+encodes of different sizes run in parallel
+"""
+
+import ctypes
+import ctypes.util
+import io
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# How mirror copies are made, most preferred first: "reflink" clones the
+# blocks copy-on-write (APFS, Btrfs, XFS), "hardlink" shares the file (an
+# edit to one copy shows in all), "copy" writes the bytes again
+LINK_MODES = ("reflink", "hardlink", "copy")
+
+# Linux FICLONE ioctl: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+def write_if_changed(path, data):
+    """Atomically replace ``path`` with ``data`` unless it already holds those bytes
+
+    Unchanged files are left alone, mtime included, so tools that watch
+    timestamps (Xcode's actool) see no change. New bytes go to a temp file
+    in the same directory that is renamed over ``path``, so readers never
+    see a partial write. Returns True if the file was written.
+    """
+    path = Path(path)
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return True
+
+def _clonefile():
+    """macOS ``clonefile(2)`` from libc, or None"""
+    if sys.platform != "darwin":
+        return None
+    libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    clonefile = getattr(libc, "clonefile", None)
+    if clonefile is not None:
+        clonefile.argtypes = (ctypes.c_char_p, ctypes.c_char_p, ctypes.c_uint32)
+    return clonefile
+
+_CLONEFILE = _clonefile()
+
+def reflink(source, destination):
+    """Clone ``source`` to a new ``destination`` copy-on-write; False if unsupported"""
+    if _CLONEFILE is not None:
+        return _CLONEFILE(os.fsencode(source), os.fsencode(destination), 0) == 0
+    if sys.platform.startswith("linux"):
+        import fcntl
+        with open(source, 'rb') as src, open(destination, 'wb') as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return True
+            except OSError:
+                pass
+        os.unlink(destination)
+    return False
+
+def materialize(source, destination, data=None, link="reflink", sync=False):
+    """Make ``destination`` a copy of the already written ``source``
+
+    Tries the ``LINK_MODES`` from ``link`` on, so no bytes are read or
+    written when the filesystem can share them; a plain copy writes ``data``
+    from memory when given and reads ``source`` only otherwise. The result
+    is renamed into place like ``write_if_changed``, and with ``sync`` a
+    destination that already matches is left alone. Returns the mode used,
+    or None if nothing changed.
+    """
+    source, destination = Path(source), Path(destination)
+    if sync:
+        try:
+            if os.path.samefile(source, destination):
+                return None
+            if data is None:
+                data = source.read_bytes()
+            if destination.stat().st_size == len(data) and destination.read_bytes() == data:
+                return None
+        except OSError:
+            pass
+
+    temp_path = destination.with_name(f".{destination.name}.{os.getpid()}.tmp")
+    temp_path.unlink(missing_ok=True)  # Left over from an interrupted run
+    for mode in LINK_MODES[LINK_MODES.index(link):]:
+        try:
+            if mode == "reflink":
+                if not reflink(source, temp_path):
+                    continue
+            elif mode == "hardlink":
+                try:
+                    os.link(source, temp_path)
+                except OSError:
+                    continue
+            else:
+                with open(temp_path, 'wb') as f:
+                    f.write(source.read_bytes() if data is None else data)
+            os.replace(temp_path, destination)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        return mode
+
+def mirror_files(paths, mirrors, link="reflink", sync=True):
+    """Materialize each file in ``paths`` into every directory in ``mirrors``
+
+    Files are materialized in parallel. Returns ``(destination, mode)``
+    pairs, with mode None for destinations that were already up to date.
+    """
+    jobs = []
+    for mirror in mirrors:
+        mirror = Path(mirror)
+        mirror.mkdir(parents=True, exist_ok=True)
+        jobs.extend((Path(path), mirror / Path(path).name) for path in paths)
+
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+        modes = executor.map(lambda job: materialize(*job, link=link, sync=sync), jobs)
+        return [(destination, mode) for (_, destination), mode in zip(jobs, modes)]
+
+class IconExporter:
+    """Encode and write images in the background with back-pressure
+
+    ``submit`` blocks once ``max_pending`` images are queued or encoding, so
+    exporting many variants never holds more than that many images beyond
+    what the caller keeps. Use as a context manager; leaving the block waits
+    for every write and raises the first error.
+
+    ``encoder`` replaces ``Image.save``: it is called as ``encoder(image)``
+    and returns ``(data, detail)``, where ``detail`` is reported with each
+    written file (see icon_png.PNGOptimizer).
+
+    With ``keep_data`` the encoded bytes stay available afterwards as
+    ``encoded``, keyed by image size, for packing into .icns/.ico
+    containers (see icon_pack) without re-encoding.
+
+    With ``sync`` files are written through ``write_if_changed``; the paths
+    end up in ``changed`` or ``unchanged``.
+
+    ``mirrors`` are extra directories that get every written file under the
+    same name, made by ``materialize`` from the first path and the encoded
+    bytes still in memory, so they cost no extra encode or read.
+    ``mirrored`` lists ``(destination, mode)`` as returned by it.
+    """
+
+    def __init__(self, workers=None, max_pending=None, image_format="PNG", encoder=None,
+                 keep_data=False, sync=False, mirrors=(), link="reflink"):
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.image_format = image_format
+        self.encoder = encoder
+        self.keep_data = keep_data
+        self.sync = sync
+        self.mirrors = [Path(mirror) for mirror in mirrors]
+        self.link = link
+        self.mirrored = []
+        for mirror in self.mirrors:
+            mirror.mkdir(parents=True, exist_ok=True)
+        self.written = []
+        self.encoded = {}
+        self.changed = []
+        self.unchanged = []
+        self._slots = threading.BoundedSemaphore(max_pending or self.workers * 2)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="icon-export")
+        self._futures = []
+
+    def _encode_and_write(self, image, paths, options):
+        try:
+            if self.encoder is not None:
+                data, detail = self.encoder(image, **options)
+            else:
+                buffer = io.BytesIO()
+                image.save(buffer, self.image_format, **options)
+                data, detail = buffer.getvalue(), None
+            changed = []
+            for path in paths:
+                if self.sync:
+                    changed.append(write_if_changed(path, data))
+                else:
+                    with open(path, 'wb') as f:
+                        f.write(data)
+                    changed.append(True)
+            mirrored = [(mirror / path.name, materialize(paths[0], mirror / path.name, data,
+                                                         self.link, self.sync))
+                        for path in paths for mirror in self.mirrors]
+            return paths, changed, mirrored, image.size, data if self.keep_data else len(data), detail
+        finally:
+            self._slots.release()
+
+    def submit(self, image, paths, **options):
+        """Queue ``image`` to be encoded once and written to ``paths``
+
+        ``paths`` is a path or a list of paths that get identical bytes (an
+        empty list only encodes, for ``keep_data``); ``options`` are passed
+        to ``Image.save`` or the encoder.
+        """
+        if isinstance(paths, (str, os.PathLike)):
+            paths = [paths]
+        paths = [Path(path) for path in paths]
+        # Finish lazy decoding here; images are not safe to load from two threads
+        image.load()
+
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._encode_and_write, image, paths, options)
+        except BaseException:
+            self._slots.release()
+            raise
+        self._futures.append(future)
+        return future
+
+    def close(self):
+        """Wait for all queued writes and return ``(path, bytes, detail)`` in submit order"""
+        self._executor.shutdown(wait=True)
+        written = []
+        for future in self._futures:
+            paths, changed, mirrored, image_size, data, detail = future.result()
+            self.mirrored.extend(mirrored)
+            if self.keep_data:
+                self.encoded[image_size] = data
+                data = len(data)
+            for path, was_changed in zip(paths, changed):
+                (self.changed if was_changed else self.unchanged).append(path)
+            written.extend((path, data, detail) for path in paths)
+        return written
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.written = self.close()
+        else:
+            self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Vectorized gradient backgrounds for the icon generators
+Builds linear, diagonal and radial multi-stop gradients as whole NumPy arrays
+"""
+
+import numpy as np
+from PIL import Image
+
+def _pixel_grid(width, height, window):
+    """Return pixel coordinate grids for the whole canvas or a window of it"""
+    x0, y0, x1, y1 = window if window is not None else (0, 0, width, height)
+    return np.mgrid[y0:y1, x0:x1].astype(np.float64)
+
+def linear_ratio(width, height, direction="vertical", window=None):
+    """Return the 0..1 position of every pixel along a linear gradient
+
+    Matches the loops the generators used to run: ``y / height`` for
+    vertical, ``x / width`` for horizontal and ``(x + y) / (width + height)``
+    for diagonal gradients. ``window`` is an optional ``(x0, y0, x1, y1)``
+    box; only those pixels of the full-size gradient are computed.
+    """
+    ys, xs = _pixel_grid(width, height, window)
+
+    if direction == "vertical":
+        return ys / height
+    if direction == "horizontal":
+        return xs / width
+    if direction == "diagonal":
+        return (xs + ys) / (width + height)
+
+    raise ValueError(f"Unknown gradient direction: {direction}")
+
+def radial_ratio(width, height, center=None, radius=None, window=None):
+    """Return the 0..1 distance of every pixel from the gradient center
+
+    By default the center is ``(width // 2, height // 2)`` and the radius is
+    the distance from the center to the corner, clamped at 1.0.
+    """
+    if center is None:
+        center = (width // 2, height // 2)
+    center_x, center_y = center
+    if radius is None:
+        radius = np.sqrt(center_x**2 + center_y**2)
+
+    ys, xs = _pixel_grid(width, height, window)
+    distance = np.sqrt((xs - center_x)**2 + (ys - center_y)**2)
+    return np.minimum(distance / radius, 1.0)
+
+def apply_stops(ratio, stops):
+    """Map a ratio array onto color stops and return a uint8 color array
+
+    ``stops`` is a list of ``(position, color)`` pairs sorted by position.
+    Channels are interpolated as ``start + (end - start) * t`` and truncated
+    like ``int()``, then clamped to 0..255 the way ImageDraw clamps fills.
+    """
+    if len(stops) < 2:
+        raise ValueError("A gradient needs at least two stops")
+
+    positions = [position for position, _ in stops]
+    if positions != sorted(positions):
+        raise ValueError("Gradient stops must be sorted by position")
+
+    channels = len(stops[0][1])
+    result = np.empty(ratio.shape + (channels,), dtype=np.float64)
+    segments = np.searchsorted(positions, ratio, side="left") - 1
+    segments = np.clip(segments, 0, len(stops) - 2)
+
+    for index in range(len(stops) - 1):
+        start_pos, start_color = stops[index]
+        end_pos, end_color = stops[index + 1]
+
+        selected = segments == index
+        local = ratio[selected]
+        if (start_pos, end_pos) != (0, 1):
+            local = (local - start_pos) / (end_pos - start_pos)
+        local = np.clip(local, 0.0, 1.0)
+
+        for channel in range(channels):
+            start = start_color[channel]
+            end = end_color[channel]
+            result[..., channel][selected] = start + (end - start) * local
+
+    return np.clip(np.trunc(result), 0, 255).astype(np.uint8)
+
+def gradient_array(width, height, stops, kind="vertical", window=None, **options):
+    """Return a gradient (or a ``window`` of it) as a uint8 (rows, columns, channels) array"""
+    if kind == "radial":
+        ratio = radial_ratio(width, height, window=window, **options)
+    else:
+        ratio = linear_ratio(width, height, kind, window)
+    return apply_stops(ratio, stops)
+
+def gradient_image(size, stops, kind="vertical", alpha=255, window=None, **options):
+    """Create an RGBA gradient image
+
+    ``size`` is an int for square canvases or a ``(width, height)`` pair.
+    Stops given as RGB colors are filled with a constant ``alpha``. With a
+    ``window`` box only that part of the full-size gradient is returned.
+    """
+    width, height = (size, size) if isinstance(size, int) else size
+    pixels = gradient_array(width, height, stops, kind, window, **options)
+
+    if pixels.shape[-1] == 3:
+        opaque = np.full(pixels.shape[:2] + (1,), alpha, dtype=np.uint8)
+        pixels = np.concatenate([pixels, opaque], axis=-1)
+
+    return Image.fromarray(pixels, "RGBA")
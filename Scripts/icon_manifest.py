@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Content-addressed build manifest for generated icon sets
+Records, for every output file, a hash of everything it was built from, so
+re-runs only regenerate outputs whose inputs changed. Manifests live in the
+icon cache, one per output folder, so nothing is added to the asset catalog
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import PIL
+
+from icon_cache import CACHE_ROOT
+from icon_export import write_if_changed
+
+# Under CACHE_ROOT; manifests hold machine-specific file stamps
+MANIFEST_DIR = "manifests"
+
+# Bump when the resize or encode pipeline changes so every output is rebuilt
+BUILD_VERSION = 1
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def manifest_path(output_dir):
+    """Where the manifest for ``output_dir`` is kept, or None with no cache"""
+    if not CACHE_ROOT:
+        return None
+    name = hashlib.sha256(str(Path(output_dir).resolve()).encode()).hexdigest()[:16]
+    return Path(CACHE_ROOT) / MANIFEST_DIR / f"{name}.json"
+
+def build_key(*parts):
+    """Hash JSON-serializable build inputs into an output key
+
+    The build version and the Pillow version are always included, since
+    either can change the bytes an unchanged input produces.
+    """
+    payload = json.dumps((BUILD_VERSION, PIL.__version__) + parts, sort_keys=True,
+                         separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class BuildManifest:
+    """Output keys and file stamps for one output folder
+
+    An output is fresh when its recorded key matches and the file still has
+    the size and modification time recorded after it was written, so edited
+    or deleted outputs are rebuilt too. The manifest is stored at
+    ``manifest_path``; with the cache disabled every output is stale.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+        self.path = manifest_path(output_dir)
+        self.hits = []
+        self.misses = []
+        self.entries = {}
+        if self.path is not None:
+            try:
+                with open(self.path, 'r') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                pass
+
+    def _stamp(self, filename):
+        try:
+            stat = (self.output_dir / filename).stat()
+        except OSError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def is_fresh(self, filename, key):
+        """Check an output against its key, counting the hit or miss"""
+        entry = self.entries.get(filename)
+        fresh = (entry is not None and entry["key"] == key
+                 and entry["stamp"] == self._stamp(filename))
+        (self.hits if fresh else self.misses).append(filename)
+        return fresh
+
+    def record(self, filename, key):
+        """Remember that ``filename`` was just written from ``key``"""
+        self.entries[filename] = {"key": key, "stamp": self._stamp(filename)}
+
+    def save(self):
+        """Write the manifest atomically, leaving an identical one untouched"""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_if_changed(self.path, json.dumps(self.entries, indent=2, sort_keys=True).encode())
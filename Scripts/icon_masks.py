@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Cached iOS corner masks for the icon generators
+Masks are memoized in memory (LRU) and persisted to disk per size and corner model
+"""
+
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from icon_cache import CACHE_ROOT
+
+# iOS corner radius ratio used by the classic rounded-rectangle mask
+CORNER_RADIUS_RATIO = 0.2237
+
+# Exponent of the superellipse that approximates Apple's continuous corners
+SQUIRCLE_EXPONENT = 5.0
+
+# Number of masks kept in memory before the least recently used is evicted
+MASK_CACHE_SIZE = 32
+
+CORNER_MODELS = ("rounded", "squircle")
+
+def _draw_rounded(size, supersample, box=None):
+    """Rasterize the classic rounded rectangle, optionally supersampled"""
+    canvas = size * supersample
+    x0, y0, x1, y1 = [v * supersample for v in box] if box else (0, 0, canvas, canvas)
+    mask = Image.new('L', (x1 - x0, y1 - y0), 0)
+    mask_draw = ImageDraw.Draw(mask)
+    corner_radius = int(canvas * CORNER_RADIUS_RATIO)
+    # The legacy masks use an inclusive (0, 0)-(size, size) box; supersampled
+    # masks use the exact pixel box so the corners stay symmetric
+    extent = canvas if supersample == 1 else canvas - 1
+    mask_draw.rounded_rectangle([(-x0, -y0), (extent - x0, extent - y0)], corner_radius, fill=255)
+
+    if supersample > 1:
+        mask = mask.reduce(supersample)
+    return mask
+
+def _draw_squircle(size, supersample, box=None):
+    """Rasterize a continuous-curvature squircle directly at ``size``
+
+    Coverage is estimated from ``supersample``² sub-pixel samples per pixel,
+    so small sizes get anti-aliased corners without a resample pass.
+    """
+    x0, y0, x1, y1 = box or (0, 0, size, size)
+
+    def axis(start, stop):
+        samples = (np.arange(start * supersample, stop * supersample) + 0.5) / supersample
+        # Normalize sample positions to -1..1 around the icon center
+        return np.abs(samples * (2.0 / size) - 1.0) ** SQUIRCLE_EXPONENT
+
+    inside = (axis(y0, y1)[:, None] + axis(x0, x1)[None, :]) <= 1.0
+    height, width = y1 - y0, x1 - x0
+    coverage = inside.reshape(height, supersample, width, supersample).mean(axis=(1, 3))
+    return Image.fromarray(np.round(coverage * 255).astype(np.uint8), 'L')
+
+def _cache_path(size, model, supersample):
+    if not CACHE_ROOT:
+        return None
+    return Path(CACHE_ROOT) / "masks" / f"{model}-{size}-x{supersample}.png"
+
+@lru_cache(maxsize=MASK_CACHE_SIZE)
+def _load_mask(size, model, supersample):
+    """Load a mask from the disk tier, rendering and persisting it on a miss"""
+    path = _cache_path(size, model, supersample)
+    if path is not None and path.exists():
+        try:
+            with Image.open(path) as cached:
+                cached.load()
+                if cached.mode == 'L' and cached.size == (size, size):
+                    return cached.copy()
+        except OSError:
+            pass  # Corrupt or partial file; render it again below
+
+    if model == "rounded":
+        mask = _draw_rounded(size, supersample)
+    else:
+        mask = _draw_squircle(size, supersample)
+
+    if path is not None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            mask.save(temp_path, "PNG")
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not cache mask {path.name}: {e}")
+
+    return mask
+
+def corner_mask(size, model="rounded", supersample=None):
+    """Return an 'L' mask for the icon outline at ``size`` pixels
+
+    ``model`` is "rounded" for the classic ``size * 0.2237`` rounded rectangle
+    (aliased by default, identical to the old inline masks) or "squircle" for
+    continuous-curvature corners. ``supersample`` controls anti-aliasing and
+    defaults to 1 for rounded and 4 for squircle masks.
+    """
+    if model not in CORNER_MODELS:
+        raise ValueError(f"Unknown corner model: {model}")
+    if supersample is None:
+        supersample = 1 if model == "rounded" else 4
+
+    # Callers get their own copy so pasting or drawing never touches the cache
+    return _load_mask(int(size), model, int(supersample)).copy()
+
+def corner_mask_region(size, box, model="rounded", supersample=None):
+    """Return the ``(x0, y0, x1, y1)`` window of a ``size`` px corner mask
+
+    Used by tiled renders, where a full mask would not fit in memory. The
+    window is rasterized directly and is not cached.
+    """
+    if model not in CORNER_MODELS:
+        raise ValueError(f"Unknown corner model: {model}")
+    if supersample is None:
+        supersample = 1 if model == "rounded" else 4
+
+    if model == "rounded":
+        return _draw_rounded(int(size), int(supersample), box)
+    return _draw_squircle(int(size), int(supersample), box)
+
+def clear_mask_cache(disk=False):
+    """Drop the in-memory masks, and the persisted ones too if ``disk``"""
+    _load_mask.cache_clear()
+
+    if disk and CACHE_ROOT:
+        for path in (Path(CACHE_ROOT) / "masks").glob("*.png"):
+            path.unlink()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+In-memory .icns and .ico packing for icon sets
+Wraps PNG bytes that the export stage already encoded into macOS .icns and
+multi-resolution Windows .ico / favicon containers, without decoding,
+re-encoding or temp files
+"""
+
+import argparse
+import struct
+from pathlib import Path
+
+from icon_tiles import PNG_SIGNATURE
+
+# .icns element types that hold PNG data, with their pixel sizes
+ICNS_TYPES = [
+    (b"ic11", 32),    # 16x16@2x
+    (b"ic12", 64),    # 32x32@2x
+    (b"ic07", 128),   # 128x128
+    (b"ic13", 256),   # 128x128@2x
+    (b"ic08", 256),   # 256x256
+    (b"ic14", 512),   # 256x256@2x
+    (b"ic09", 512),   # 512x512
+    (b"ic10", 1024),  # 512x512@2x
+]
+
+# .ico entries to include when available; the format tops out at 256
+ICO_SIZES = (16, 24, 32, 48, 64, 128, 256)
+FAVICON_SIZES = (16, 32, 48)
+
+def png_size(data):
+    """Return ``(width, height)`` from PNG bytes' IHDR, checking the signature"""
+    if data[:8] != PNG_SIGNATURE or data[12:16] != b"IHDR":
+        raise ValueError("not PNG data")
+    return struct.unpack(">II", data[16:24])
+
+def _by_pixels(pngs):
+    """Map square pixel size -> PNG bytes; accepts ``{size: data}`` or ``{(w, h): data}``"""
+    result = {}
+    for data in pngs.values():
+        width, height = png_size(data)
+        if width == height:
+            result[width] = data
+    return result
+
+def pack_icns(pngs):
+    """Build .icns bytes with every ic07-ic14 element the PNGs can fill
+
+    ``pngs`` maps sizes to encoded PNG bytes (as ``IconExporter.encoded``
+    does). A table of contents comes first, as iconutil writes it.
+    """
+    available = _by_pixels(pngs)
+    elements = [(kind, available[size]) for kind, size in ICNS_TYPES if size in available]
+    if not elements:
+        raise ValueError("no PNG sizes usable in an .icns file")
+
+    toc = b"".join(kind + struct.pack(">I", 8 + len(data)) for kind, data in elements)
+    body = [b"TOC " + struct.pack(">I", 8 + len(toc)) + toc]
+    body.extend(kind + struct.pack(">I", 8 + len(data)) + data for kind, data in elements)
+    length = 8 + sum(len(part) for part in body)
+    return b"icns" + struct.pack(">I", length) + b"".join(body)
+
+def pack_ico(pngs, sizes=ICO_SIZES):
+    """Build multi-resolution .ico bytes with PNG-compressed entries
+
+    Entries are the ``sizes`` present in ``pngs``, smallest first. PNG
+    entries are supported by Windows Vista and later and by every browser.
+    """
+    available = _by_pixels(pngs)
+    entries = [(size, available[size]) for size in sorted(sizes) if size in available]
+    if not entries:
+        raise ValueError("no PNG sizes usable in an .ico file")
+
+    offset = 6 + 16 * len(entries)
+    directory = [struct.pack("<HHH", 0, 1, len(entries))]
+    for size, data in entries:
+        dimension = 0 if size >= 256 else size  # 0 means 256
+        directory.append(struct.pack("<BBBBHHII", dimension, dimension, 0, 0, 1, 32,
+                                     len(data), offset))
+        offset += len(data)
+    return b"".join(directory) + b"".join(data for _, data in entries)
+
+def write_containers(pngs, output_dir, name, favicon=False):
+    """Write ``name.icns`` and ``name.ico`` (plus ``favicon.ico``) from encoded PNGs
+
+    Returns ``(path, bytes)`` for each file written.
+    """
+    output_dir = Path(output_dir)
+    containers = [(output_dir / f"{name}.icns", pack_icns(pngs)),
+                  (output_dir / f"{name}.ico", pack_ico(pngs))]
+    if favicon:
+        containers.append((output_dir / "favicon.ico", pack_ico(pngs, FAVICON_SIZES)))
+
+    for path, data in containers:
+        with open(path, 'wb') as f:
+            f.write(data)
+    return [(path, len(data)) for path, data in containers]
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack existing icon PNGs into .icns and .ico files")
+    parser.add_argument("pngs", nargs="+", help="square PNG files, one per size")
+    parser.add_argument("-o", "--output-dir", default=".")
+    parser.add_argument("--name", default="AppIcon", help="container base name")
+    parser.add_argument("--favicon", action="store_true", help="also write favicon.ico")
+    args = parser.parse_args()
+
+    pngs = {}
+    for path in args.pngs:
+        data = Path(path).read_bytes()
+        pngs[png_size(data)] = data
+
+    for path, size in write_containers(pngs, args.output_dir, args.name, args.favicon):
+        print(f"📦 Created: {path.name} ({size:,} bytes)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+PNG encoding optimizer for icon outputs
+Tries row filters, zlib levels and strategies, and lossless color-type
+reductions (RGB, or an 8-bit-or-smaller palette with alpha) per image,
+cheapest first, and stops once a size/time objective says the next try is
+not worth its encoding time; never keeps anything larger than Pillow's own
+"""
+
+import io
+import struct
+import time
+import zlib
+from collections import namedtuple
+
+import numpy as np
+
+from icon_tiles import PNG_SIGNATURE, png_chunk
+
+FILTERS = ("none", "sub", "up", "average", "paeth", "adaptive")
+FILTER_TYPES = {"none": 0, "sub": 1, "up": 2, "average": 3, "paeth": 4}
+
+STRATEGIES = {
+    "default": zlib.Z_DEFAULT_STRATEGY,
+    "filtered": zlib.Z_FILTERED,
+    "rle": zlib.Z_RLE,
+}
+
+# By default images up to this many pixels search the candidates that win
+# on icon artwork, where palettes and small headers make a difference;
+# larger ones only try a palette, and only if they have at most 256 colors.
+# ``exhaustive=True`` tries every combination at any size.
+SEARCH_PIXELS = 64 * 64
+
+# Relative encode cost of a filter: adaptive runs all five to pick per row
+FILTER_COST = {"adaptive": 5}
+
+# Bytes per pixel before filtering, as a relative cost of each color type
+COLOR_COST = {"palette": 1, "rgb": 3, "rgba": 4}
+
+# One candidate encoding: PNG bytes, a short description and encode seconds
+Encoding = namedtuple("Encoding", "data method seconds")
+
+def _filter(rows, bpp, kind):
+    """Apply one PNG filter to 2D uint8 rows; ``bpp`` is bytes per pixel"""
+    rows = rows.astype(np.int16)
+    left = np.zeros_like(rows)
+    left[:, bpp:] = rows[:, :-bpp]
+    up = np.zeros_like(rows)
+    up[1:] = rows[:-1]
+
+    if kind == "none":
+        predicted = 0
+    elif kind == "sub":
+        predicted = left
+    elif kind == "up":
+        predicted = up
+    elif kind == "average":
+        predicted = (left + up) // 2
+    else:
+        upper_left = np.zeros_like(rows)
+        upper_left[1:, bpp:] = rows[:-1, :-bpp]
+        estimate = left + up - upper_left
+        pa, pb, pc = np.abs(estimate - left), np.abs(estimate - up), np.abs(estimate - upper_left)
+        predicted = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, upper_left))
+    return ((rows - predicted) & 0xFF).astype(np.uint8)
+
+def filter_rows(rows, bpp, kind="adaptive"):
+    """Filter packed rows and prefix each with its filter type byte
+
+    ``adaptive`` picks, per row, the filter with the smallest sum of
+    absolute signed residuals, the heuristic libpng uses.
+    """
+    if kind != "adaptive":
+        filtered = _filter(rows, bpp, kind)
+        types = np.full(rows.shape[0], FILTER_TYPES[kind], dtype=np.uint8)
+    else:
+        candidates = np.stack([_filter(rows, bpp, name) for name in FILTER_TYPES])
+        cost = np.abs(candidates.view(np.int8).astype(np.int32)).sum(axis=2)
+        types = cost.argmin(axis=0).astype(np.uint8)
+        filtered = candidates[types, np.arange(rows.shape[0])]
+    return np.concatenate([types[:, None], filtered], axis=1)
+
+def palette_indices(pixels):
+    """Return ``(palette, indices)`` if RGBA pixels use at most 256 colors, else None
+
+    Translucent colors are sorted first so the tRNS chunk can stop at the
+    last of them.
+    """
+    packed = np.ascontiguousarray(pixels).reshape(-1, 4).view(np.uint32).ravel()
+    colors, inverse = np.unique(packed, return_inverse=True)
+    if colors.size > 256:
+        return None
+
+    palette = colors.view(np.uint8).reshape(-1, 4)
+    order = np.argsort(palette[:, 3] == 255, kind="stable")
+    rank = np.empty(order.size, dtype=np.uint8)
+    rank[order] = np.arange(order.size)
+    return palette[order], rank[inverse].reshape(pixels.shape[:2])
+
+def _pack_indices(indices, depth):
+    """Pack palette indices at ``depth`` bits per pixel, rows padded to whole bytes"""
+    if depth == 8:
+        return indices
+    per_byte = 8 // depth
+    height, width = indices.shape
+    padded = np.zeros((height, -(-width // per_byte) * per_byte), dtype=np.uint8)
+    padded[:, :width] = indices
+    groups = padded.reshape(height, -1, per_byte)
+    shifts = np.arange(per_byte - 1, -1, -1, dtype=np.uint8) * depth
+    return np.bitwise_or.reduce(groups << shifts, axis=2).astype(np.uint8)
+
+def encode_png(pixels, color="rgba", filter="adaptive", level=9, strategy="default", palette=None):
+    """Encode RGBA pixels as PNG bytes
+
+    ``color`` is ``rgba``, ``rgb`` (only if every pixel is opaque) or
+    ``palette`` (only if there are at most 256 colors); all are lossless.
+    ``palette`` may pass in ``palette_indices(pixels)`` computed earlier.
+    """
+    height, width = pixels.shape[:2]
+    chunks = []
+
+    if color == "palette":
+        palette, indices = palette or palette_indices(pixels)
+        depth = next(bits for bits in (1, 2, 4, 8) if len(palette) <= 1 << bits)
+        rows, bpp, color_type = _pack_indices(indices, depth), 1, 3
+        chunks.append(png_chunk(b"PLTE", palette[:, :3].tobytes()))
+        translucent = int(np.count_nonzero(palette[:, 3] < 255))
+        if translucent:
+            chunks.append(png_chunk(b"tRNS", palette[:translucent, 3].tobytes()))
+    elif color == "rgb":
+        rows, bpp, depth, color_type = pixels[..., :3].reshape(height, -1), 3, 8, 2
+    else:
+        rows, bpp, depth, color_type = pixels.reshape(height, -1), 4, 8, 6
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 15, 9, STRATEGIES[strategy])
+    data = compressor.compress(filter_rows(rows, bpp, filter).tobytes()) + compressor.flush()
+
+    header = png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, depth, color_type, 0, 0, 0))
+    return PNG_SIGNATURE + header + b"".join(chunks) + png_chunk(b"IDAT", data) + png_chunk(b"IEND", b"")
+
+def png_candidates(pixels, palette=None, exhaustive=False):
+    """Return ``(color, filter, level, strategy)`` combinations to try, cheapest first
+
+    ``palette`` is ``palette_indices(pixels)``. Small images (and any image
+    with ``exhaustive``) try the adaptive and unfiltered rows at a fast and
+    a thorough level, or everything with ``exhaustive``; palette images
+    mostly compress best unfiltered, as the PNG spec suggests. Larger
+    images only try a palette.
+    """
+    colors = []
+    if palette is not None:
+        colors.append("palette")
+    if exhaustive or pixels.shape[0] * pixels.shape[1] <= SEARCH_PIXELS:
+        if np.all(pixels[..., 3] == 255):
+            colors.append("rgb")
+        colors.append("rgba")
+
+    candidates = []
+    for color in colors:
+        if exhaustive:
+            filters, levels, strategies = FILTERS, (9,), STRATEGIES
+        elif color == "palette":
+            filters, levels, strategies = ("none", "adaptive"), (9,), ("default",)
+        else:
+            filters, levels, strategies = ("none", "adaptive"), (6, 9), ("default", "filtered")
+        candidates.extend((color, filter_name, level, strategy) for filter_name in filters
+                          for level in levels for strategy in strategies)
+    return sorted(candidates, key=_cost)
+
+def _cost(candidate):
+    """Relative encode cost of a candidate, for ordering and time estimates"""
+    color, filter_name, level, _ = candidate
+    return COLOR_COST[color] * FILTER_COST.get(filter_name, 1) * (2 if level == 9 else 1)
+
+def _timed(encode):
+    start = time.perf_counter()
+    data = encode()
+    return data, time.perf_counter() - start
+
+def pillow_png(image, **options):
+    """Encode with Pillow's PNG encoder (``optimize=True`` by default)"""
+    options = options or {"optimize": True}
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", **options)
+    return buffer.getvalue()
+
+def optimize_png(image, seconds_cost=0.0, exhaustive=False):
+    """Encode ``image`` the best way worth trying; returns ``(best, baseline)`` Encodings
+
+    The baseline is Pillow with ``optimize=True``, and ``best`` is never
+    larger than it. Other candidates go cheapest first, and each is an
+    improvement only if ``bytes + seconds_cost * seconds`` is lower. The
+    search stops once the next candidate's estimated time, priced at
+    ``seconds_cost`` bytes per second, exceeds the bytes it could possibly
+    save, so a high cost returns the baseline at Pillow's speed.
+    """
+    pixels = np.asarray(image if image.mode == 'RGBA' else image.convert('RGBA'))
+
+    data, seconds = _timed(lambda: pillow_png(image))
+    baseline = best = Encoding(data, "pillow optimize", seconds)
+
+    # Computed once; it decides whether a palette is possible at all
+    palette = palette_indices(pixels)
+
+    # Seconds per unit of _cost, starting from Pillow's RGBA encode
+    rate = seconds / _cost(("rgba", "adaptive", 9, "default"))
+    best_score = len(best.data)
+    for candidate in png_candidates(pixels, palette, exhaustive):
+        if seconds_cost * rate * _cost(candidate) >= len(best.data):
+            break
+        color, filter_name, level, strategy = candidate
+        data, seconds = _timed(lambda: encode_png(pixels, color, filter_name, level, strategy, palette))
+        rate = max(rate, seconds / _cost(candidate))
+        encoding = Encoding(data, f"{color} {filter_name} z{level} {strategy}", seconds)
+        score = len(data) + seconds_cost * seconds
+        if len(data) <= len(baseline.data) and score < best_score:
+            best, best_score = encoding, score
+    return best, baseline
+
+class PNGOptimizer:
+    """Encoder for IconExporter that optimizes each image and keeps a report"""
+
+    def __init__(self, seconds_cost=0.0, exhaustive=False):
+        self.seconds_cost = seconds_cost
+        self.exhaustive = exhaustive
+
+    def __call__(self, image, **options):
+        best, baseline = optimize_png(image, self.seconds_cost, self.exhaustive)
+        saved = len(baseline.data) - len(best.data)
+        return best.data, f"{best.method}, {saved:,} bytes saved"
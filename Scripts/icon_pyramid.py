@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Mipmap pyramid downscaler for icon size tables
+Resolves the unique pixel sizes a table asks for and builds each one from the
+nearest suitable larger level instead of resampling the master every time
+"""
+
+from PIL import Image
+
+# LANCZOS levels are taken from a level at least this many times larger, so
+# resampling passes never stack closely enough to soften each other
+QUALITY_RATIO = 2
+
+def plan_pyramid(master_size, sizes):
+    """Return ``(size, source, factor)`` steps that build every unique size
+
+    Steps run from the largest size down; ``source`` is the master size or an
+    earlier step. ``factor`` is the ``Image.reduce`` factor for an exact ratio
+    to the master or a level reduced from it (box averages compose exactly,
+    so chained reduces equal one reduce of the master), or None for a LANCZOS
+    resize.
+    """
+    built = [master_size]
+    boxed = {master_size}  # Levels that are box averages of the master
+    steps = []
+    for size in sorted(set(sizes), reverse=True):
+        if size == master_size:
+            continue
+
+        exact = [level for level in boxed if level > size and level % size == 0]
+        if exact:
+            source = min(exact)
+            steps.append((size, source, source // size))
+            boxed.add(size)
+        else:
+            larger = [level for level in built if level >= size * QUALITY_RATIO]
+            source = min(larger) if larger else master_size
+            steps.append((size, source, None))
+        built.append(size)
+    return steps
+
+def pyramid_work(master_size, sizes):
+    """Source pixels the pyramid reads, next to resampling the master for every entry"""
+    pyramid = sum(source * source for _, source, _ in plan_pyramid(master_size, sizes))
+    independent = sum(master_size * master_size for size in sizes if size != master_size)
+    return pyramid, independent
+
+def iter_pyramid(master, sizes):
+    """Yield ``(size, image)`` once per unique size, largest first, as each level is built
+
+    The master itself is yielded for its own size. A non-square master is
+    first stretched to the largest size, as resizing it straight to each size
+    would.
+    """
+    if master.width != master.height:
+        largest = max(sizes)
+        master = master.resize((largest, largest), Image.Resampling.LANCZOS)
+
+    levels = {master.width: master}
+    if master.width in sizes:
+        yield master.width, master
+    for size, source, factor in plan_pyramid(master.width, sizes):
+        if factor is not None:
+            levels[size] = levels[source].reduce(factor)
+        else:
+            levels[size] = levels[source].resize((size, size), Image.Resampling.LANCZOS)
+        yield size, levels[size]
+
+def build_pyramid(master, sizes):
+    """Build a {size: image} dict of square levels from a square ``master``
+
+    Duplicate sizes are built once.
+    """
+    return dict(iter_pyramid(master, sizes))
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Premultiplied-alpha resampler with reusable kernels
+Separable filter weights are built once per (source, target, filter) and
+cached as matrices, so resizing dozens of same-sized variants only costs the
+matrix products; RGBA is filtered premultiplied so transparent corners
+never bleed dark fringes into the artwork
+"""
+
+import argparse
+import time
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image
+
+def _box(x):
+    return ((x > -0.5) & (x <= 0.5)).astype(np.float64)
+
+def _triangle(x):
+    return np.maximum(1.0 - np.abs(x), 0.0)
+
+def _bicubic(x, a=-0.5):
+    x = np.abs(x)
+    near = ((a + 2.0) * x - (a + 3.0)) * x * x + 1.0
+    far = (((x - 5.0) * x + 8.0) * x - 4.0) * a
+    return np.where(x < 1.0, near, np.where(x < 2.0, far, 0.0))
+
+def _lanczos(x):
+    return np.where(np.abs(x) < 3.0, np.sinc(x) * np.sinc(x / 3.0), 0.0)
+
+# name: (support radius, weight function), matching Pillow's filters
+FILTERS = {
+    "box": (0.5, _box),
+    "bilinear": (1.0, _triangle),
+    "bicubic": (2.0, _bicubic),
+    "lanczos": (3.0, _lanczos),
+}
+
+# Float pixels resampled in one stacked matrix product; larger batches are split
+BATCH_BYTES = 64 * 1024 * 1024
+
+# Output rows per kernel block; each block only multiplies the source span
+# its filter windows cover instead of the whole axis
+BLOCK_ROWS = 32
+
+def kernel_weights(source, target, filter="lanczos"):
+    """Return the dense ``(target, source)`` weight matrix for one axis
+
+    Rows are normalized to sum to 1. When shrinking, the filter is stretched
+    by the scale factor so every source pixel contributes, as Pillow does.
+    """
+    support, weight = FILTERS[filter]
+    scale = source / target
+    stretch = max(scale, 1.0)
+    centers = (np.arange(target) + 0.5) * scale
+    offsets = (np.arange(source)[None, :] + 0.5 - centers[:, None]) / stretch
+    weights = weight(offsets)
+    weights[np.abs(offsets) > support] = 0.0
+
+    totals = weights.sum(axis=1, keepdims=True)
+    return (weights / np.where(totals == 0.0, 1.0, totals)).astype(np.float32)
+
+@lru_cache(maxsize=256)
+def kernel(source, target, filter="lanczos"):
+    """Return cached ``(start, stop, first, last, weights)`` blocks for one axis
+
+    Output rows ``start:stop`` are ``weights @ source[first:last]``; the
+    weight arrays are read-only so every caller can share them.
+    """
+    weights = kernel_weights(source, target, filter)
+    blocks = []
+    for start in range(0, target, BLOCK_ROWS):
+        stop = min(start + BLOCK_ROWS, target)
+        used = np.flatnonzero(weights[start:stop].any(axis=0))
+        first, last = int(used[0]), int(used[-1]) + 1
+        block = np.ascontiguousarray(weights[start:stop, first:last])
+        block.setflags(write=False)
+        blocks.append((start, stop, first, last, block))
+    return tuple(blocks)
+
+def premultiply(pixels, out=None):
+    """Float32 copy of uint8 RGBA pixels with color scaled by alpha"""
+    flat = pixels.reshape(-1, 4)
+    result = np.empty(flat.shape, dtype=np.float32) if out is None else out.reshape(-1, 4)
+    result[:, 3] = flat[:, 3]
+    alpha = result[:, 3] * np.float32(1 / 255)
+    for channel in range(3):
+        np.multiply(flat[:, channel], alpha, out=result[:, channel])
+    return result.reshape(pixels.shape)
+
+def unpremultiply(pixels):
+    """Round premultiplied float RGBA back to straight-alpha uint8"""
+    flat = pixels.reshape(-1, 4)
+    alpha = np.clip(flat[:, 3], 0.0, 255.0)
+    scale = np.divide(np.float32(255), alpha, out=np.zeros_like(alpha), where=alpha > 0.0)
+    result = np.empty(flat.shape, dtype=np.uint8)
+    for channel in range(3):
+        color = flat[:, channel] * scale
+        result[:, channel] = np.rint(np.clip(color, 0.0, 255.0, out=color))
+    result[:, 3] = np.rint(alpha)
+    return result.reshape(pixels.shape)
+
+def _batches(arrays):
+    """Yield float32 ``(count, height, width, channels)`` stacks of uint8 arrays
+
+    4-channel arrays are premultiplied while they are copied in. Each stack
+    holds at most ``BATCH_BYTES`` of floats.
+    """
+    arrays = [array if array.ndim == 3 else array[..., None] for array in arrays]
+    batch = max(1, BATCH_BYTES // (arrays[0].size * 4))
+    for start in range(0, len(arrays), batch):
+        chunk = arrays[start:start + batch]
+        pixels = np.empty((len(chunk),) + chunk[0].shape, dtype=np.float32)
+        for index, array in enumerate(chunk):
+            if array.shape[-1] == 4:
+                premultiply(array, out=pixels[index])
+            else:
+                pixels[index] = array
+        yield pixels
+
+def _resample_batch(pixels, size, filter):
+    """Resample a float stack from ``_batches`` to ``size``, returning uint8 arrays"""
+    count, height, width, channels = pixels.shape
+    target_width, target_height = size
+
+    # Rows as (N, H, W*C), then columns as (N*h, W, C); matmul broadcasts
+    # each block over the leading axis
+    pixels = pixels.reshape(count, height, width * channels)
+    rows = np.empty((count, target_height, width * channels), dtype=np.float32)
+    for start, stop, first, last, weights in kernel(height, target_height, filter):
+        np.matmul(weights, pixels[:, first:last], out=rows[:, start:stop])
+
+    rows = rows.reshape(count * target_height, width, channels)
+    result = np.empty((count * target_height, target_width, channels), dtype=np.float32)
+    for start, stop, first, last, weights in kernel(width, target_width, filter):
+        np.matmul(weights, rows[:, first:last], out=result[:, start:stop])
+    result = result.reshape(count, target_height, target_width, channels)
+
+    if channels == 4:
+        return list(unpremultiply(result))
+    return list(np.rint(np.clip(result, 0.0, 255.0)).astype(np.uint8))
+
+def resample_arrays(arrays, sizes, filter="lanczos"):
+    """Resample same-shaped uint8 pixel arrays to each of ``sizes``
+
+    ``sizes`` are ``(width, height)`` pairs; returns ``{size: [arrays]}`` in
+    input order. Arrays are stacked and premultiplied once per batch, then
+    every size is a product with cached kernels. 4-channel arrays are
+    treated as RGBA.
+    """
+    results = {size: [] for size in sizes}
+    if not arrays:
+        return results
+    for pixels in _batches(arrays):
+        for size in results:
+            results[size].extend(_resample_batch(pixels, size, filter))
+    return results
+
+def _to_images(arrays, mode):
+    return [Image.fromarray(array[..., 0] if array.shape[-1] == 1 else array, mode)
+            for array in arrays]
+
+def resample_many(images, size, filter="lanczos"):
+    """Resample same-sized PIL images to ``size`` (width, height) with shared kernels"""
+    return resample_table(images, [size], filter)[size]
+
+def resample(image, size, filter="lanczos"):
+    """Resample one PIL image to ``size`` (width, height)"""
+    return resample_many([image], size, filter)[0]
+
+def resample_table(images, sizes, filter="lanczos"):
+    """Resample same-sized PIL images to every size; returns ``{size: [images]}``
+
+    An int size means a square. This is the batch-export path: dozens of
+    variants times a whole size table reuse one premultiplied copy and one
+    kernel pair per size.
+    """
+    targets = {size: (size, size) if isinstance(size, int) else tuple(size) for size in sizes}
+    if not images:
+        return {size: [] for size in targets}
+    mode = images[0].mode
+    arrays = resample_arrays([np.asarray(image) for image in images], list(targets.values()), filter)
+    return {size: _to_images(arrays[target], mode) for size, target in targets.items()}
+
+def kernel_stats():
+    """Hits, misses and entries of the kernel cache"""
+    info = kernel.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "kernels": info.currsize}
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the cached-kernel resampler with Pillow")
+    parser.add_argument("source", help="RGBA source image")
+    parser.add_argument("--sizes", default="16,32,64,128,152,167,180,256,512",
+                        help="comma-separated square sizes in pixels")
+    parser.add_argument("--variants", type=int, default=24, help="copies resampled as one batch")
+    parser.add_argument("--filter", choices=sorted(FILTERS), default="lanczos")
+    args = parser.parse_args()
+
+    image = Image.open(args.source).convert("RGBA")
+    images = [image] * args.variants
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    start = time.perf_counter()
+    ours = resample_table(images, sizes, args.filter)
+    elapsed = time.perf_counter() - start
+
+    resampling = getattr(Image.Resampling, args.filter.upper())
+    start = time.perf_counter()
+    pillow = {size: [variant.resize((size, size), resampling) for variant in images] for size in sizes}
+    pillow_elapsed = time.perf_counter() - start
+
+    # Compare where Pillow's 8-bit premultiplication still keeps color detail
+    worst = 0
+    for size in sizes:
+        a, b = (np.asarray(table[size][0], dtype=np.int16) for table in (ours, pillow))
+        visible = b[..., 3] >= 32
+        worst = max(worst, int(np.abs(a - b)[visible].max(initial=0)))
+
+    print(f"📐 {args.variants} x {image.width}x{image.height} -> {len(sizes)} sizes ({args.filter})")
+    print(f"⚡ Cached kernels: {elapsed:.3f}s, Pillow: {pillow_elapsed:.3f}s")
+    print(f"🔍 Max difference from Pillow on visible pixels: {worst}, kernels {kernel_stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+Declarative icon scenes for the Prism icon generators
+Loads a JSON/TOML scene description, compiles it into an optimized render plan
+and renders that plan natively at any output size
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import math
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFilter
+
+from icon_cache import RasterCache
+from icon_gradients import gradient_image
+from icon_native import REFERENCE_SIZE, finish_icon, scale_length, stroke_width
+
+SCENES_DIR = Path(__file__).resolve().parent / "scenes"
+
+# Blurs wider than this (in canvas pixels) run on a downsampled copy
+LARGE_BLUR_RADIUS = 32
+
+# Bump when rendering changes so persisted layers from older code are ignored
+RENDER_VERSION = 1
+
+# Backgrounds and finished layers, shared across renders and across runs
+LAYER_CACHE = RasterCache("layers")
+
+def load_scene(scene):
+    """Load a scene by name (from Scripts/scenes), by path, or pass a dict through"""
+    if isinstance(scene, dict):
+        return scene
+
+    path = Path(scene)
+    if not path.suffix:
+        for suffix in (".json", ".toml"):
+            candidate = SCENES_DIR / f"{scene}{suffix}"
+            if candidate.exists():
+                path = candidate
+                break
+
+    if path.suffix == ".toml":
+        import tomllib
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def _scene_key(*parts):
+    """Hash JSON-serializable parts into a stable cache key"""
+    payload = json.dumps((RENDER_VERSION,) + parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def _color(value):
+    color = tuple(int(channel) for channel in value)
+    return color if len(color) == 4 else color + (255,)
+
+def _is_opaque(color):
+    return color is None or _color(color)[3] == 255
+
+def _expand_prism(op):
+    """Expand a prism op into the polygon and line ops it is made of
+
+    Vertices are ``center + scale * front`` for the front triangle and the
+    same plus ``scale * offset`` for the back triangle, named ``front_top``,
+    ``back_left`` and so on.
+    """
+    cx, cy = op["center"]
+    scale = op["scale"]
+    offset_x = scale * op["offset"][0]
+    offset_y = scale * op["offset"][1]
+
+    vertices = {}
+    for corner, (fx, fy) in op["front"].items():
+        front = (cx + scale * fx, cy + scale * fy)
+        vertices[f"front_{corner}"] = front
+        vertices[f"back_{corner}"] = (front[0] + offset_x, front[1] + offset_y)
+
+    expanded = []
+    for part in op["parts"]:
+        part = dict(part)
+        kind = "polygon" if "polygon" in part else "line"
+        names = part.pop(kind)
+        expanded.append(dict(part, op=kind, points=[vertices[name] for name in names]))
+    return expanded
+
+def _scale_op(op, canvas, supersample):
+    """Convert an op's reference-pixel geometry into canvas pixels"""
+    scaled = {"op": op["op"]}
+
+    def point(p):
+        return (scale_length(p[0], canvas), scale_length(p[1], canvas))
+
+    if "points" in op:
+        scaled["points"] = [point(p) for p in op["points"]]
+    if "box" in op:
+        scaled["box"] = [point(p) for p in op["box"]]
+    if "center" in op:
+        radius = op["radius"]
+        rx, ry = radius if isinstance(radius, (list, tuple)) else (radius, radius)
+        cx, cy = op["center"]
+        if op["op"] == "sparkle":
+            scaled["center"] = point(op["center"])
+            scaled["radius"] = scale_length(rx, canvas)
+            scaled["inner"] = op.get("inner", 0.3)
+        else:
+            scaled["box"] = [point((cx - rx, cy - ry)), point((cx + rx, cy + ry))]
+    if "corner_radius" in op:
+        scaled["corner_radius"] = int(scale_length(op["corner_radius"], canvas))
+
+    for key in ("fill", "outline"):
+        if op.get(key) is not None:
+            scaled[key] = _color(op[key])
+    if "width" in op:
+        scaled["width"] = stroke_width(op["width"], canvas, supersample)
+    return scaled
+
+def _op_bounds(op):
+    """Return the canvas-pixel box an op can touch, including its stroke"""
+    if "points" in op:
+        points = op["points"]
+    elif "box" in op:
+        points = op["box"]
+    else:
+        cx, cy = op["center"]
+        points = [(cx - op["radius"], cy - op["radius"]), (cx + op["radius"], cy + op["radius"])]
+
+    margin = op.get("width", 1) + 1
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    return (int(math.floor(min(xs))) - margin, int(math.floor(min(ys))) - margin,
+            int(math.ceil(max(xs))) + margin + 1, int(math.ceil(max(ys))) + margin + 1)
+
+def _draw_op(draw, op, origin=(0, 0)):
+    """Draw one compiled op; ImageDraw replaces pixels, it does not blend
+
+    ``origin`` is the canvas position of the raster's top-left pixel, so an
+    op can be drawn into a layer that only covers part of the canvas.
+    """
+    kind = op["op"]
+    fill = op.get("fill")
+    outline = op.get("outline")
+    origin_x, origin_y = origin
+
+    def shift(points):
+        if origin == (0, 0):
+            return points
+        return [(x - origin_x, y - origin_y) for x, y in points]
+
+    if kind == "polygon":
+        if "width" in op:
+            draw.polygon(shift(op["points"]), fill=fill, outline=outline, width=op["width"])
+        else:
+            draw.polygon(shift(op["points"]), fill=fill, outline=outline)
+    elif kind == "line":
+        draw.line(shift(op["points"]), fill=fill, width=op.get("width", 1))
+    elif kind == "ellipse":
+        draw.ellipse(shift(op["box"]), fill=fill, outline=outline, width=op.get("width", 1))
+    elif kind == "rounded_rectangle":
+        draw.rounded_rectangle(shift(op["box"]), radius=op["corner_radius"], fill=fill,
+                               outline=outline, width=op.get("width", 1))
+    elif kind == "sparkle":
+        # Four-pointed star with its inner vertices on the diagonals
+        cx, cy = shift([op["center"]])[0]
+        r = op["radius"]
+        inner = r * op["inner"]
+        points = [
+            (cx, cy - r), (cx + inner, cy - inner),
+            (cx + r, cy), (cx + inner, cy + inner),
+            (cx, cy + r), (cx - inner, cy + inner),
+            (cx - r, cy), (cx - inner, cy - inner),
+        ]
+        draw.polygon(points, fill=fill)
+    else:
+        raise ValueError(f"Unknown scene op: {kind}")
+
+def _layer_is_opaque(layer):
+    """True if a layer covers the whole canvas with fully opaque pixels"""
+    background = layer.get("background")
+    if not background or layer.get("blur"):
+        return False
+    if "color" in background:
+        if not _is_opaque(background["color"]):
+            return False
+    elif any(len(color) == 4 and color[3] != 255 for _, color in background["stops"]):
+        return False
+    return all(_is_opaque(op.get("fill")) and _is_opaque(op.get("outline"))
+               for op in layer["ops"])
+
+def blur_halo(radius):
+    """Pixels a Gaussian blur of ``radius`` can pull in from outside a window"""
+    return int(math.ceil(radius * 3)) + 1
+
+def blur_scale(radius):
+    """Downsampling factor for a blur; 1 unless the radius is large"""
+    if radius <= LARGE_BLUR_RADIUS:
+        return 1
+    return 2 ** int(math.log2(radius / (LARGE_BLUR_RADIUS / 2)))
+
+def _expand_box(box, halo, canvas):
+    x0, y0, x1, y1 = box
+    return (max(0, x0 - halo), max(0, y0 - halo), min(canvas, x1 + halo), min(canvas, y1 + halo))
+
+def _intersect(a, b):
+    box = (max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3]))
+    return box if box[0] < box[2] and box[1] < box[3] else None
+
+def _union(boxes):
+    boxes = list(boxes)
+    return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+            max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+def _align_box(box, factor, canvas):
+    """Grow a box to multiples of ``factor`` so downsampled blurs line up"""
+    x0, y0, x1, y1 = box
+    return (x0 - x0 % factor, y0 - y0 % factor,
+            min(canvas, -(-x1 // factor) * factor), min(canvas, -(-y1 // factor) * factor))
+
+def _area(box):
+    return (box[2] - box[0]) * (box[3] - box[1])
+
+def compile_scene(scene, size=1024, supersample=1, region=None):
+    """Compile a scene into a render plan for one output size
+
+    The compiler expands macros (prisms) into primitive ops, skips layers that
+    a later layer fully occludes, folds opaque overlay layers into the pass of
+    the layer below them, and keys every background and layer so identical
+    sub-results are rendered once and shared. Layers without a background are
+    only rasterized, blurred and composited over their ops' bounding box plus
+    the blur halo.
+
+    ``region`` restricts the plan to an ``(x0, y0, x1, y1)`` box of output
+    pixels; blurred layers are rendered with a halo around it so the result
+    matches the same box of a full render.
+    """
+    scene = load_scene(scene)
+    canvas = size * supersample
+    region = tuple(region) if region is not None else (0, 0, size, size)
+    box = tuple(v * supersample for v in region)
+    reference = scene.get("size", REFERENCE_SIZE)
+    if reference != REFERENCE_SIZE:
+        raise ValueError(f"Scenes must be authored at {REFERENCE_SIZE} px, got {reference}")
+
+    layers = []
+    for layer in scene["layers"]:
+        ops = []
+        for op in layer.get("ops", []):
+            ops.extend(_expand_prism(op) if op["op"] == "prism" else [op])
+        layers.append(dict(layer, ops=ops))
+
+    stats = {"layers": len(layers), "skipped": [], "merged": [], "ops": 0, "coverage": {}}
+
+    # A replacing or fully opaque layer hides everything underneath it
+    first_visible = 0
+    for index, layer in enumerate(layers):
+        if layer.get("composite", "alpha") == "replace" or _layer_is_opaque(layer):
+            first_visible = index
+    stats["skipped"] = [layer.get("id", str(i)) for i, layer in enumerate(layers[:first_visible])]
+
+    steps = []
+    for index, layer in enumerate(layers[first_visible:]):
+        layer_id = layer.get("id", str(first_visible + index))
+        blur = scale_length(layer["blur"], canvas) if layer.get("blur") else 0
+        ops = [_scale_op(op, canvas, supersample) for op in layer["ops"]]
+        stats["ops"] += len(ops)
+        composite = "replace" if index == 0 else layer.get("composite", "alpha")
+        background = layer.get("background")
+
+        # Opaque ops drawn over a finished, unblurred layer give the same
+        # pixels as compositing a separate transparent canvas on top of it
+        mergeable = (
+            steps
+            and composite == "alpha"
+            and not background
+            and not blur
+            and not steps[-1]["blur"]
+            and all(_is_opaque(op.get("fill")) and _is_opaque(op.get("outline")) for op in ops)
+        )
+        if mergeable:
+            previous = steps[-1]
+            previous["passes"].append(ops)
+            previous["key"] = _scene_key(previous["key"], layer, canvas, supersample, box)
+            if not previous["background"] and ops:
+                bounds = _union([previous["raster"]] + [_op_bounds(op) for op in ops])
+                previous["raster"] = _intersect(bounds, box) or previous["raster"]
+                previous["place"] = previous["raster"]
+            stats["merged"].append(layer_id)
+            continue
+
+        # Render only where the layer can have pixels: the whole window for
+        # backgrounds, otherwise the ops' bounds grown by the blur halo
+        halo = blur_halo(blur) if blur else 0
+        raster = _expand_box(box, halo, canvas)
+        if not background:
+            if not ops:
+                continue
+            bounds = _expand_box(_union(_op_bounds(op) for op in ops), halo, canvas)
+            raster = _intersect(bounds, raster)
+            if raster is None:
+                continue
+
+        scale = blur_scale(blur)
+        if scale > 1:
+            raster = _align_box(raster, scale, canvas)
+        place = _intersect(raster, box)
+        if place is None:
+            continue
+        stats["coverage"][layer_id] = _area(raster) / (canvas * canvas)
+
+        steps.append({
+            "id": layer_id,
+            "key": _scene_key(layer, canvas, supersample, box),
+            "raster": raster,
+            "place": place,
+            "background": background,
+            "background_key": _scene_key(background, canvas, raster) if background else None,
+            "passes": [ops],
+            "blur": blur,
+            "blur_scale": scale,
+            "composite": composite,
+        })
+
+    return {
+        "name": scene.get("name", "scene"),
+        "size": size,
+        "supersample": supersample,
+        "canvas": canvas,
+        "region": region,
+        "box": box,
+        "corner": scene.get("corner", "rounded"),
+        "steps": steps,
+        "stats": stats,
+    }
+
+def _shared(key, build, share=True, persist=True):
+    """Return a cached sub-result, building and caching it on a miss
+
+    Keys hash a layer's own parameters together with everything upstream of
+    it (merged layers, canvas, region), so editing one layer only
+    invalidates that layer; the rest come from memory or disk.
+    """
+    if not share:
+        return build()
+    return LAYER_CACHE.get(key, build, persist)
+
+def _render_background(background, canvas, box):
+    x0, y0, x1, y1 = box
+    if "color" in background:
+        return Image.new('RGBA', (x1 - x0, y1 - y0), _color(background["color"]))
+    stops = [(position, tuple(color)) for position, color in background["stops"]]
+    window = None if box == (0, 0, canvas, canvas) else box
+    return gradient_image(canvas, stops, kind=background.get("gradient", "vertical"),
+                          window=window)
+
+def _blur(img, radius, scale):
+    """Gaussian-blur a layer, going through a downsampled copy for big radii"""
+    if scale == 1:
+        return img.filter(ImageFilter.GaussianBlur(radius=radius))
+
+    small = img.reduce(scale).filter(ImageFilter.GaussianBlur(radius=radius / scale))
+    return small.resize(img.size, Image.Resampling.BILINEAR)
+
+def _render_step(step, canvas, share=True):
+    """Rasterize one step over its raster box and crop it to its placement"""
+    x0, y0, x1, y1 = step["raster"]
+    if step["background"]:
+        background = _shared(step["background_key"],
+                             lambda: _render_background(step["background"], canvas, step["raster"]),
+                             share)
+        img = background.copy() if share else background
+    else:
+        img = Image.new('RGBA', (x1 - x0, y1 - y0), (0, 0, 0, 0))
+
+    for ops in step["passes"]:
+        draw = ImageDraw.Draw(img)
+        for op in ops:
+            _draw_op(draw, op, (x0, y0))
+
+    if step["blur"]:
+        img = _blur(img, step["blur"], step["blur_scale"])
+
+    place = step["place"]
+    if place != step["raster"]:
+        # Drop the blur halo around the part that is composited
+        img = img.crop((place[0] - x0, place[1] - y0, place[2] - x0, place[3] - y0))
+    return img
+
+def render_plan(plan, share=True, persist=True):
+    """Execute a compiled plan and return the finished, corner-masked icon
+
+    Each layer is composited only over its placement box. With ``share`` off,
+    backgrounds and layers bypass the layer cache; tiled renders use this to
+    keep memory bounded by the tile. With ``persist`` off, layers are cached in
+    memory only, which suits one-off renders such as animation frames.
+    """
+    canvas = plan["canvas"]
+    x0, y0, x1, y1 = box = plan["box"]
+    final = None
+
+    for step in plan["steps"]:
+        layer = _shared(step["key"], lambda: _render_step(step, canvas, share), share, persist)
+        offset = (step["place"][0] - x0, step["place"][1] - y0)
+
+        if step["composite"] == "replace":
+            if step["place"] == box:
+                final = layer.copy()
+                continue
+            final = Image.new('RGBA', (x1 - x0, y1 - y0), (0, 0, 0, 0))
+            final.paste(layer, offset)
+        else:
+            if final is None:
+                final = Image.new('RGBA', (x1 - x0, y1 - y0), (0, 0, 0, 0))
+            final.paste(layer, offset, layer)
+
+    if final is None:
+        final = Image.new('RGBA', (x1 - x0, y1 - y0), (0, 0, 0, 0))
+
+    region = None if plan["region"] == (0, 0, plan["size"], plan["size"]) else plan["region"]
+    return finish_icon(final, plan["size"], plan["supersample"], plan["corner"], region)
+
+def render_scene(scene, size=1024, supersample=1, region=None, share=True, persist=True):
+    """Load, compile and render a scene (or a ``region`` of it) at ``size`` pixels"""
+    return render_plan(compile_scene(scene, size, supersample, region), share, persist)
+
+def with_overrides(scene, overrides):
+    """Return a copy of a scene with per-layer/op values replaced
+
+    ``overrides`` maps dotted paths to new values. A path starts with a layer
+    id, then names op ids or nested keys, e.g. ``"artwork.prism.offset"`` or
+    ``"artwork.background.stops"``.
+    """
+    scene = copy.deepcopy(load_scene(scene))
+    layers = {layer.get("id"): layer for layer in scene["layers"]}
+
+    for path, value in overrides.items():
+        parts = path.split(".")
+        if len(parts) < 2 or parts[0] not in layers:
+            raise ValueError(f"Invalid override path: {path}")
+
+        target = layers[parts[0]]
+        for part in parts[1:-1]:
+            ops = {op.get("id"): op for op in target.get("ops", [])}
+            if part in ops:
+                target = ops[part]
+            elif isinstance(target.get(part), dict):
+                target = target[part]
+            else:
+                raise ValueError(f"Invalid override path: {path}")
+        target[parts[-1]] = value
+
+    return scene
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a declarative icon scene")
+    parser.add_argument("scene", help="scene name in Scripts/scenes or a .json/.toml path")
+    parser.add_argument("-o", "--output", help="output PNG (default: <scene name>.png)")
+    parser.add_argument("--size", type=int, default=1024, help="output size in pixels")
+    parser.add_argument("--supersample", type=int, default=1, help="supersampling factor")
+    parser.add_argument("--plan", action="store_true", help="print the compiled plan summary")
+    args = parser.parse_args()
+
+    plan = compile_scene(args.scene, args.size, args.supersample)
+    if args.plan:
+        stats = plan["stats"]
+        print(f"📋 {plan['name']}: {len(plan['steps'])} passes for {stats['layers']} layers, "
+              f"{stats['ops']} ops")
+        if stats["skipped"]:
+            print(f"   Skipped occluded layers: {', '.join(stats['skipped'])}")
+        if stats["merged"]:
+            print(f"   Merged layers: {', '.join(stats['merged'])}")
+        for layer_id, coverage in stats["coverage"].items():
+            print(f"   {layer_id}: rasterized over {coverage:.0%} of the canvas")
+
+    output = Path(args.output or f"{plan['name']}.png")
+    render_plan(plan).save(output, "PNG")
+    print(f"✅ Rendered {output}")
+    if args.plan:
+        stats = LAYER_CACHE.stats
+        print(f"   Layer cache: {stats['memory_hits']} memory hits, {stats['disk_hits']} disk hits, "
+              f"{stats['misses']} rendered")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Reduced-resolution loading for oversized source artwork
+Decodes 8K-16K masters only at the resolution the largest output needs:
+JPEGs are DCT-scaled while decoding, 8-bit PNGs are inflated and reduced a
+band of rows at a time, and anything else is box-reduced right after
+decoding, always before the RGBA conversion
+"""
+
+import argparse
+import io
+import resource
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+from icon_pyramid import QUALITY_RATIO, iter_pyramid
+from icon_tiles import PNG_SIGNATURE, png_chunk
+
+# Designers' masters go well past Pillow's decompression-bomb limit (about
+# 89 MP); allow trusted sources up to 32K x 32K
+MAX_SOURCE_PIXELS = 32768 * 32768
+
+# Modes Image.reduce works on directly; others are converted first
+REDUCIBLE_MODES = ("L", "LA", "RGB", "RGBA", "RGBa", "La", "I", "F")
+
+# Channels per pixel of the 8-bit PNG color types the band decoder handles
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+# Filtered PNG bytes inflated per band; peak memory scales with it
+BAND_BYTES = 1024 * 1024
+
+# PNG chunks a band needs to decode like the whole file
+BAND_CHUNKS = (b"PLTE", b"tRNS")
+
+def _png_stream(f, read_size=1024 * 1024):
+    """Parse a PNG's chunks; return ``(IHDR fields, band chunks, IDAT pieces)``
+
+    IDAT data is read lazily, ``read_size`` bytes at a time, so even files
+    written as one huge IDAT chunk are never held whole.
+    """
+    if f.read(8) != PNG_SIGNATURE:
+        raise ValueError("not a PNG file")
+
+    header, extra = None, []
+    while True:
+        length, kind = struct.unpack(">I4s", f.read(8))
+        if kind == b"IDAT":
+            break
+        data = f.read(length)
+        f.read(4)  # CRC
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", data)
+        elif kind in BAND_CHUNKS:
+            extra.append(png_chunk(kind, data))
+        elif kind == b"IEND":
+            raise ValueError("PNG has no image data")
+
+    def pieces(length, kind):
+        while kind == b"IDAT":
+            while length:
+                piece = f.read(min(length, read_size))
+                length -= len(piece)
+                yield piece
+            f.read(4)  # CRC
+            length, kind = struct.unpack(">I4s", f.read(8))
+
+    return header, extra, pieces(length, kind)
+
+def _decode_band(header, extra, rows, count, previous_row):
+    """Decode ``count`` filtered rows with Pillow
+
+    The band is wrapped in a PNG of its own, stored uncompressed. Filters
+    refer to the row above, so the last decoded row of the previous band is
+    prepended unfiltered and cropped off again.
+    """
+    width, _, depth, color_type = header[:4]
+    if previous_row is not None:
+        rows = b"\0" + previous_row + rows
+        count += 1
+    ihdr = struct.pack(">IIBBBBB", width, count, depth, color_type, 0, 0, 0)
+    png = (PNG_SIGNATURE + png_chunk(b"IHDR", ihdr) + b"".join(extra)
+           + png_chunk(b"IDAT", zlib.compress(rows, 0)) + png_chunk(b"IEND", b""))
+    band = Image.open(io.BytesIO(png))
+    band.load()
+    last_row = band.crop((0, count - 1, width, count)).tobytes()
+    if previous_row is not None:
+        band = band.crop((0, 1, width, count))
+    return band, last_row
+
+def _reducible(image):
+    """Convert palette, 1-bit and color-keyed images so Image.reduce keeps their look"""
+    if image.mode not in REDUCIBLE_MODES or "transparency" in image.info:
+        return image.convert("RGBA")
+    return image
+
+def reduce_png(path, factor):
+    """Decode an 8-bit, non-interlaced PNG reduced by ``factor``, band by band
+
+    Each band is a whole number of ``factor`` rows, so the result matches
+    ``Image.reduce`` on the full decode while only one band of full-size
+    pixels is ever in memory. Returns ``(image, peak pixel bytes)``, or
+    ``None`` for PNGs this decoder does not handle.
+    """
+    with open(path, 'rb') as f:
+        header, extra, pieces = _png_stream(f)
+        width, height, depth, color_type, _, _, interlace = header
+        if depth != 8 or interlace or color_type not in PNG_CHANNELS:
+            return None
+
+        stride = 1 + width * PNG_CHANNELS[color_type]
+        band_rows = factor * max(1, BAND_BYTES // (stride * factor))
+        inflater = zlib.decompressobj()
+        pending = bytearray()
+        output = None
+        previous_row = None
+        peak_bytes = 0
+        y = 0
+
+        def flush(rows, count):
+            nonlocal output, previous_row, peak_bytes
+            band, previous_row = _decode_band(header, extra, rows, count, previous_row)
+            band = _reducible(band)
+            reduced = band.reduce(factor)
+            if output is None:
+                output = Image.new(reduced.mode, (-(-width // factor), -(-height // factor)))
+            output.paste(reduced, (0, y // factor))
+            peak_bytes = max(peak_bytes, len(rows) + band.width * band.height * len(band.getbands()))
+
+        for piece in pieces:
+            pending += inflater.decompress(piece)
+            while len(pending) >= band_rows * stride and y < height:
+                count = min(band_rows, height - y)
+                flush(bytes(pending[:count * stride]), count)
+                del pending[:count * stride]
+                y += count
+        pending += inflater.flush()
+        if y < height:
+            count = height - y
+            flush(bytes(pending[:count * stride]), count)
+
+    return output, peak_bytes + output.width * output.height * len(output.getbands())
+
+def _peak_rss_bytes():
+    """Peak resident set size of this process (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def load_source(path, largest, full=False):
+    """Open ``path`` as RGBA, decoded no larger than ``largest`` outputs need
+
+    The image keeps at least ``QUALITY_RATIO`` times the largest output size
+    (or its own size if smaller), so the resize pyramid still has headroom.
+    Returns ``(image, stats)``; ``stats`` has the source and decoded sizes,
+    the steps used, seconds taken and an estimate of the pixel memory held
+    at the peak. ``full`` decodes at full size, like a plain ``Image.open``.
+
+    Sources up to ``MAX_SOURCE_PIXELS`` are trusted artwork, so Pillow's
+    decompression bomb limit is raised to that only while this call opens
+    them and restored afterwards.
+    """
+    limit = Image.MAX_IMAGE_PIXELS
+    if limit is not None:
+        Image.MAX_IMAGE_PIXELS = max(limit, MAX_SOURCE_PIXELS)
+    try:
+        return _load_source(path, largest, full)
+    finally:
+        Image.MAX_IMAGE_PIXELS = limit
+
+def _load_source(path, largest, full):
+    start = time.perf_counter()
+    image = Image.open(path)
+    source_size = image.size
+    target = largest * QUALITY_RATIO
+    steps = []
+
+    if not full and image.format == "JPEG":
+        # Scale by 1/2, 1/4 or 1/8 inside the decoder, staying >= target
+        image.draft("RGB", (target, target))
+        if image.size != source_size:
+            steps.append(f"draft {source_size[0] // image.width}x")
+
+    factor = 1 if full else min(image.width, image.height) // target
+    reduced = None
+    if factor >= 2 and image.format == "PNG":
+        image.close()
+        reduced = reduce_png(path, factor)
+        if reduced is not None:
+            image, peak_bytes = reduced
+            steps.append(f"band reduce {factor}x")
+        else:
+            image = Image.open(path)
+
+    if reduced is None:
+        image.load()
+        peak_bytes = image.width * image.height * len(image.getbands())
+        if factor >= 2:
+            image = _reducible(image).reduce(factor)
+            peak_bytes += image.width * image.height * len(image.getbands())
+            steps.append(f"reduce {factor}x")
+
+    if image.mode != "RGBA":
+        converted = image.convert("RGBA")
+        peak_bytes = max(peak_bytes, image.width * image.height * len(image.getbands())
+                         + converted.width * converted.height * 4)
+        image = converted
+
+    stats = {
+        "source_size": source_size,
+        "decoded_size": image.size,
+        "steps": steps or ["full decode"],
+        "seconds": time.perf_counter() - start,
+        "peak_bytes": peak_bytes,
+    }
+    return image, stats
+
+def _measure(path, largest, full):
+    """Worker: load and downscale to ``largest`` in a fresh process
+
+    Adds the resize time, which a full decode pushes onto the pyramid, and
+    the peak RSS of the whole run.
+    """
+    image, stats = load_source(path, largest, full)
+    start = time.perf_counter()
+    for _ in iter_pyramid(image, [largest]):
+        pass
+    stats["resize_seconds"] = time.perf_counter() - start
+    stats["peak_rss"] = _peak_rss_bytes()
+    return stats
+
+def compare_decode(path, largest):
+    """Load ``path`` reduced and at full size, each in its own process
+
+    Returns ``(reduced_stats, full_stats)`` with a measured ``peak_rss``.
+    """
+    results = []
+    for full in (False, True):
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results.append(executor.submit(_measure, path, largest, full).result())
+    return tuple(results)
+
+def describe(stats):
+    """One-line summary of a load_source result"""
+    (sw, sh), (dw, dh) = stats["source_size"], stats["decoded_size"]
+    return (f"{sw}x{sh} -> {dw}x{dh} via {', '.join(stats['steps'])} in {stats['seconds']:.2f}s, "
+            f"~{stats['peak_bytes'] / 1e6:.0f} MB of pixels at peak")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare reduced and full decoding of a source image")
+    parser.add_argument("source", help="source artwork (PNG, JPEG, ...)")
+    parser.add_argument("--size", type=int, default=1024, help="largest output size in pixels")
+    args = parser.parse_args()
+
+    reduced, full = compare_decode(args.source, args.size)
+    for label, stats in (("📉 Reduced", reduced), ("🐘 Full   ", full)):
+        print(f"{label}: {describe(stats)}; resize {stats['resize_seconds']:.2f}s, "
+              f"peak RSS {stats['peak_rss'] / 1e6:.0f} MB")
+
+    total = {name: stats["seconds"] + stats["resize_seconds"] for name, stats in
+             (("reduced", reduced), ("full", full))}
+    print(f"✅ Saved {total['full'] - total['reduced']:.2f}s and "
+          f"{(full['peak_rss'] - reduced['peak_rss']) / 1e6:.0f} MB peak RSS")
+
+if __name__ == "__main__":
+    main()
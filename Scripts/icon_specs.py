@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+App icon slot table shared by the icon scripts
+One list of asset-catalog slots drives which sizes are rendered, how files
+are named and what goes into AppIcon.appiconset/Contents.json
+"""
+
+import json
+from collections import namedtuple
+from pathlib import Path
+
+# One asset-catalog slot. ``size`` is in points ("83.5x83.5"); ``scale`` is
+# an int, or None for single-size slots that Contents.json lists unscaled.
+IconSpec = namedtuple("IconSpec", "filename idiom size scale platform")
+
+APP_ICON_SPECS = [
+    # iOS Universal (1024x1024)
+    IconSpec("ios-marketing-1024x1024@1x.png", "universal", "1024x1024", None, "ios"),
+
+    # iOS App Icon sizes (for backward compatibility)
+    IconSpec("iphone-60x60@2x.png", "iphone", "60x60", 2, None),
+    IconSpec("iphone-60x60@3x.png", "iphone", "60x60", 3, None),
+    IconSpec("ipad-76x76@1x.png", "ipad", "76x76", 1, None),
+    IconSpec("ipad-76x76@2x.png", "ipad", "76x76", 2, None),
+    IconSpec("ipad-83.5x83.5@2x.png", "ipad", "83.5x83.5", 2, None),
+
+    # macOS sizes
+    IconSpec("mac-16x16@1x.png", "mac", "16x16", 1, None),
+    IconSpec("mac-16x16@2x.png", "mac", "16x16", 2, None),
+    IconSpec("mac-32x32@1x.png", "mac", "32x32", 1, None),
+    IconSpec("mac-32x32@2x.png", "mac", "32x32", 2, None),
+    IconSpec("mac-128x128@1x.png", "mac", "128x128", 1, None),
+    IconSpec("mac-128x128@2x.png", "mac", "128x128", 2, None),
+    IconSpec("mac-256x256@1x.png", "mac", "256x256", 1, None),
+    IconSpec("mac-256x256@2x.png", "mac", "256x256", 2, None),
+    IconSpec("mac-512x512@1x.png", "mac", "512x512", 1, None),
+    IconSpec("mac-512x512@2x.png", "mac", "512x512", 2, None),
+]
+
+def spec_pixels(spec):
+    """Pixel width of the square image a slot needs"""
+    return int(float(spec.size.split("x")[0]) * (spec.scale or 1))
+
+def spec_name(spec, prefix="AppIcon"):
+    """Script-style file name for a slot, e.g. ``AppIcon-16x16@2x.png``"""
+    suffix = f"@{spec.scale}x" if spec.scale and spec.scale > 1 else ""
+    return f"{prefix}-{spec.size}{suffix}.png"
+
+def select_specs(specs, *idioms):
+    """Return the slots for the given idioms, in table order"""
+    return [spec for spec in specs if spec.idiom in idioms]
+
+def load_specs(contents_path):
+    """Read the slots of an AppIcon.appiconset/Contents.json
+
+    Slots without a file get a name like ``iphone-60x60@2x.png``. Dark and
+    tinted appearance slots need their own artwork, so they are left out.
+    """
+    with open(contents_path, 'r') as f:
+        contents = json.load(f)
+
+    specs = []
+    for image in contents.get("images", []):
+        if "size" not in image or image.get("appearances"):
+            continue
+        scale = int(image["scale"].rstrip("x")) if "scale" in image else None
+        filename = image.get("filename") or f"{image['idiom']}-{image['size']}@{scale or 1}x.png"
+        specs.append(IconSpec(filename, image["idiom"], image["size"], scale, image.get("platform")))
+    return specs
+
+def specs_for_catalog(assets_dir):
+    """Slots of an existing app icon set, or the default table for a new one
+
+    An existing catalog is authoritative: only its slots are generated. A
+    single-size iOS catalog (one 1024 px universal icon, as Xcode 14+
+    creates) gets no per-size iPhone/iPad files, since Xcode derives those
+    sizes itself; use APP_ICON_SPECS to produce them anyway.
+    """
+    contents_path = Path(assets_dir) / "Contents.json"
+    if contents_path.exists():
+        specs = load_specs(contents_path)
+        if specs:
+            return specs
+    return list(APP_ICON_SPECS)
+
+def contents_json(specs):
+    """Build the Contents.json structure listing ``specs``"""
+    images = []
+    for spec in specs:
+        image = {"filename": spec.filename, "idiom": spec.idiom}
+        if spec.platform:
+            image["platform"] = spec.platform
+        if spec.scale:
+            image["scale"] = f"{spec.scale}x"
+        image["size"] = spec.size
+        images.append(image)
+    return {"images": images, "info": {"author": "xcode", "version": 1}}
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tiled, bounded-memory rendering for very large icon artwork
+Renders a scene in horizontal bands (with blur halos) and streams each band
+straight into a PNG encoder, so 8K/16K marketing renders never hold the whole
+image in memory
+"""
+
+import argparse
+import struct
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from icon_scene import load_scene, render_scene
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Default band height in output pixels; peak memory scales with it
+BAND_HEIGHT = 256
+
+def png_chunk(kind, data):
+    """Return a PNG chunk: length, type, data and CRC"""
+    return (struct.pack(">I", len(data)) + kind + data
+            + struct.pack(">I", zlib.crc32(data, zlib.crc32(kind)) & 0xFFFFFFFF))
+
+def up_filter(rows, previous_row):
+    """Prefix each row with the PNG "Up" filter byte and subtract the row above
+
+    ``rows`` is a 2D uint8 array of packed pixel rows; ``previous_row`` is the
+    row above the first one (zeros at the top of an image).
+    """
+    above = np.vstack([previous_row[None, :], rows[:-1]])
+    filtered = np.empty((rows.shape[0], rows.shape[1] + 1), dtype=np.uint8)
+    filtered[:, 0] = 2  # Up filter
+    filtered[:, 1:] = rows - above  # uint8 arithmetic wraps modulo 256
+    return filtered
+
+class PNGStreamWriter:
+    """Write an RGBA PNG incrementally, a band of rows at a time
+
+    Rows use the PNG "Up" filter, which suits the vertical and diagonal
+    gradients of the icon backgrounds, and are deflated as they arrive.
+    """
+
+    def __init__(self, path, width, height, compress_level=6):
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._file = open(path, 'wb')
+        self._compressor = zlib.compressobj(compress_level)
+        self._previous_row = np.zeros(width * 4, dtype=np.uint8)
+
+        self._file.write(PNG_SIGNATURE)
+        # 8-bit depth, color type 6 (RGBA), deflate, adaptive filtering, no interlace
+        self._write_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+
+    def _write_chunk(self, kind, data):
+        self._file.write(png_chunk(kind, data))
+
+    def write_rows(self, image):
+        """Append the rows of an RGBA image (or uint8 array) to the PNG"""
+        rows = np.asarray(image, dtype=np.uint8)
+        if rows.shape[1:] != (self.width, 4):
+            raise ValueError(f"Expected {self.width}px wide RGBA rows, got {rows.shape}")
+        if self.rows_written + rows.shape[0] > self.height:
+            raise ValueError("More rows written than the PNG header declares")
+
+        rows = rows.reshape(rows.shape[0], -1)
+        data = self._compressor.compress(up_filter(rows, self._previous_row).tobytes())
+        if data:
+            self._write_chunk(b"IDAT", data)
+
+        self._previous_row = rows[-1].copy()
+        self.rows_written += rows.shape[0]
+
+    def close(self):
+        if self._file.closed:
+            return
+        try:
+            if self.rows_written != self.height:
+                raise ValueError(f"Wrote {self.rows_written} of {self.height} rows")
+            self._write_chunk(b"IDAT", self._compressor.flush())
+            self._write_chunk(b"IEND", b"")
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+def iter_bands(size, band_height=BAND_HEIGHT):
+    """Yield the ``(x0, y0, x1, y1)`` output boxes of each band"""
+    for y0 in range(0, size, band_height):
+        yield (0, y0, size, min(size, y0 + band_height))
+
+def render_scene_tiled(scene, size, output_path, band_height=BAND_HEIGHT, supersample=1,
+                       compress_level=6):
+    """Render ``scene`` at ``size`` pixels band by band into a PNG file
+
+    Each band is rendered with its own blur halo and written to the encoder
+    before the next one starts, so peak memory is set by ``band_height``
+    (times the halo of the largest blur), not by the output size. Edges drawn
+    from fractional coordinates may land one pixel differently than in a
+    single full-canvas render, because Pillow's polygon rasterizer is not
+    exactly translation-invariant.
+    """
+    scene = load_scene(scene)
+    with PNGStreamWriter(output_path, size, size, compress_level) as png:
+        for band in iter_bands(size, band_height):
+            png.write_rows(render_scene(scene, size, supersample, region=band, share=False))
+    return Path(output_path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Render very large icon artwork in bands")
+    parser.add_argument("scene", help="scene name in Scripts/scenes or a .json/.toml path")
+    parser.add_argument("--size", type=int, default=8192, help="output size in pixels")
+    parser.add_argument("--band-height", type=int, default=BAND_HEIGHT, help="rows per band")
+    parser.add_argument("--supersample", type=int, default=1, help="supersampling factor")
+    parser.add_argument("-o", "--output", help="output PNG (default: <scene>-<size>.png)")
+    args = parser.parse_args()
+
+    output = args.output or f"{Path(args.scene).stem}-{args.size}.png"
+    print(f"🖼️  Rendering {args.scene} at {args.size}x{args.size} in {args.band_height}px bands...")
+    start = time.perf_counter()
+    render_scene_tiled(args.scene, args.size, output, args.band_height, args.supersample)
+    print(f"✅ Saved {output} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
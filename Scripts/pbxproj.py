@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Xcode project.pbxproj reader and editor
+Parses the OpenStep property list in one pass into an object graph indexed
+by object ID, isa and build setting, and writes edits back as splices into
+the original text, so everything that was not edited stays byte-for-byte
+"""
+
+import argparse
+import re
+from collections import defaultdict
+
+# One token with the whitespace and comments before it: a quoted string, an
+# unquoted string, <data>, punctuation, the end of the text, or an error
+TOKEN = re.compile(r'''
+    (?:\s+|/\*.*?\*/|//[^\n]*)*
+    (?:
+        (?P<quoted>"(?:[^"\\]|\\.)*")
+      | (?P<bare>[^\s"{}()=;,<>/]+(?:/(?![/*])[^\s"{}()=;,<>/]*)*)
+      | (?P<data><[^>]*>)
+      | (?P<punct>[{}()=;,])
+      | (?P<end>\Z)
+      | (?P<error>.)
+    )
+''', re.VERBOSE | re.DOTALL)
+
+# Object IDs are 24 hex digits
+OBJECT_ID = re.compile(r"[0-9A-F]{24}\Z")
+
+# Strings Xcode writes without quotes
+BARE = re.compile(r"[A-Za-z0-9_$./:]+\Z")
+
+# The comment that follows an object ID, e.g. ``8FBB... /* Prysm */``
+ID_COMMENT = re.compile(r"[ \t]*/\*(.*?)\*/")
+
+ESCAPES = {"n": "\n", "t": "\t", "r": "\r", '"': '"', "\\": "\\", "'": "'"}
+
+class Scalar:
+    """A string value and where its token sits in the source text"""
+
+    __slots__ = ("value", "start", "end")
+
+    def __init__(self, value, start, end):
+        self.value = value
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"Scalar({self.value!r})"
+
+class PBXParseError(ValueError):
+    """The text is not a valid OpenStep property list"""
+
+def _unescape(text):
+    return re.sub(r"\\(U[0-9a-fA-F]{4}|.)",
+                  lambda m: chr(int(m.group(1)[1:], 16)) if len(m.group(1)) == 5
+                  else ESCAPES.get(m.group(1), m.group(1)), text)
+
+def quote(value):
+    """Format a string the way Xcode writes it: bare if it can be, else quoted"""
+    if BARE.match(value) and "//" not in value:
+        return value
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\t", "\\t")
+    return f'"{escaped}"'
+
+# Parser states for an open dictionary or array
+KEY, EQUALS, VALUE, SEMICOLON = range(4)
+ITEM, COMMA = range(2)
+
+def parse(text):
+    """Parse OpenStep plist text in one streaming pass over its tokens
+
+    Returns ``(root, mentions)``: strings become Scalars, and ``mentions``
+    lists ``(value, end offset)`` for every token shaped like an object ID.
+    """
+    root = None
+    mentions = []
+    stack = []  # [container, state, pending key] per open dictionary or array
+
+    def emit(value, offset):
+        nonlocal root
+        if not stack:
+            if root is not None:
+                raise PBXParseError(f"trailing data at offset {offset}")
+            root = value
+            return
+        frame = stack[-1]
+        container, state = frame[0], frame[1]
+        if isinstance(container, dict):
+            if state == KEY:
+                if not isinstance(value, Scalar):
+                    raise PBXParseError(f"dictionary key must be a string at offset {offset}")
+                frame[1], frame[2] = EQUALS, value.value
+            elif state == VALUE:
+                container[frame[2]] = value
+                frame[1] = SEMICOLON
+            else:
+                raise PBXParseError(f"unexpected value at offset {offset}")
+        elif state == ITEM:
+            container.append(value)
+            frame[1] = COMMA
+        else:
+            raise PBXParseError(f"expected ',' at offset {offset}")
+
+    for match in TOKEN.finditer(text):
+        kind = match.lastgroup
+        start, end = match.span(kind)
+        if kind == "bare":
+            value = match.group(kind)
+            if OBJECT_ID.match(value):
+                mentions.append((value, end))
+            emit(Scalar(value, start, end), start)
+        elif kind == "quoted":
+            emit(Scalar(_unescape(match.group(kind)[1:-1]), start, end), start)
+        elif kind == "punct":
+            punct = match.group(kind)
+            frame = stack[-1] if stack else None
+            if punct == "{":
+                stack.append([{}, KEY, None])
+            elif punct == "(":
+                stack.append([[], ITEM, None])
+            elif punct == "}" and frame and isinstance(frame[0], dict) and frame[1] == KEY:
+                emit(stack.pop()[0], start)
+            elif punct == ")" and frame and isinstance(frame[0], list):
+                emit(stack.pop()[0], start)
+            elif punct == "=" and frame and isinstance(frame[0], dict) and frame[1] == EQUALS:
+                frame[1] = VALUE
+            elif punct == ";" and frame and isinstance(frame[0], dict) and frame[1] == SEMICOLON:
+                frame[1] = KEY
+            elif punct == "," and frame and isinstance(frame[0], list) and frame[1] == COMMA:
+                frame[1] = ITEM
+            else:
+                raise PBXParseError(f"unexpected {punct!r} at offset {start}")
+        elif kind == "data":
+            emit(Scalar(match.group(kind), start, end), start)
+        elif kind == "end":
+            break
+        else:
+            raise PBXParseError(f"unexpected character at offset {start}")
+
+    if stack or root is None:
+        raise PBXParseError("unexpected end of file")
+    return root, mentions
+
+class PBXProject:
+    """Parsed project.pbxproj with indexes and splice-based edits
+
+    ``objects`` maps object IDs to their dictionaries, where string values
+    are Scalars; ``by_isa`` maps an isa to object IDs and ``settings`` maps a
+    build setting key to ``(configuration ID, Scalar)`` pairs. ``set`` and
+    the helpers built on it record replacements; ``serialize`` applies them
+    to the original text.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.root, mentions = parse(text)
+        self.objects = self.root["objects"]
+        self._edits = {}
+
+        self.by_isa = defaultdict(list)
+        self.settings = defaultdict(list)
+        for object_id, obj in self.objects.items():
+            self.by_isa[obj["isa"].value].append(object_id)
+            for key, value in obj.get("buildSettings", {}).items():
+                self.settings[key].append((object_id, value))
+
+        # ID -> the annotation comments written after each mention of it
+        self.comments = defaultdict(list)
+        for value, end in mentions:
+            if value in self.objects:
+                match = ID_COMMENT.match(text, end)
+                if match:
+                    self.comments[value].append(Scalar(match.group(1).strip(), match.start(1), match.end(1)))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(f.read())
+
+    def save(self, path):
+        """Write the project; returns True if anything was edited"""
+        text = self.serialize()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return text != self.text
+
+    def set(self, scalar, value):
+        """Replace a Scalar's value in the output, quoting as Xcode would
+
+        Setting the current value leaves the text alone but still records
+        the span for ``edit_spans``.
+        """
+        if scalar.value != value:
+            self._edits[scalar.start] = (scalar.end, quote(value), value)
+            scalar.value = value
+        elif scalar.start not in self._edits:
+            self._edits[scalar.start] = (scalar.end, self.text[scalar.start:scalar.end], value)
+
+    def set_comment(self, comment, text):
+        """Replace an annotation comment's text (comments are never quoted)"""
+        if comment.value != text:
+            self._edits[comment.start] = (comment.end, f" {text} ", None)
+            comment.value = text
+        elif comment.start not in self._edits:
+            self._edits[comment.start] = (comment.end, self.text[comment.start:comment.end], None)
+
+    def serialize(self):
+        """The original text with every recorded edit spliced in"""
+        parts = []
+        position = 0
+        for start in sorted(self._edits):
+            end, replacement, _ = self._edits[start]
+            parts.append(self.text[position:start])
+            parts.append(replacement)
+            position = end
+        parts.append(self.text[position:])
+        return "".join(parts)
+
+    def edit_spans(self):
+        """Where everything that was set sits in ``serialize()``'s output
+
+        Returns sorted ``(start, end, text, value)`` character spans, where
+        ``value`` is the unquoted string for values and None for comments.
+        """
+        spans = []
+        shift = 0
+        for start in sorted(self._edits):
+            end, replacement, value = self._edits[start]
+            spans.append((start + shift, start + shift + len(replacement), replacement, value))
+            shift += len(replacement) - (end - start)
+        return spans
+
+    def targets(self, product_type=None):
+        """IDs of native targets, optionally only those of one productType"""
+        return [object_id for object_id in self.by_isa["PBXNativeTarget"]
+                if product_type is None or self.objects[object_id]["productType"].value == product_type]
+
+    def target_configurations(self, target_id):
+        """IDs of a target's build configurations"""
+        configuration_list = self.objects[self.objects[target_id]["buildConfigurationList"].value]
+        return [item.value for item in configuration_list["buildConfigurations"]]
+
+    def build_settings(self, key, configurations=None):
+        """``(configuration ID, Scalar)`` pairs for a build setting key"""
+        return [(config_id, scalar) for config_id, scalar in self.settings.get(key, [])
+                if configurations is None or config_id in configurations]
+
+    def set_build_setting(self, key, update, configurations=None):
+        """Rewrite a build setting in place; returns how many values changed
+
+        ``update`` is the new string, or a function from the current value to
+        the new one (None leaves it unchanged).
+        """
+        changed = 0
+        for _, scalar in self.build_settings(key, configurations):
+            value = update(scalar.value) if callable(update) else update
+            if value is not None:
+                changed += value != scalar.value
+                self.set(scalar, value)
+        return changed
+
+    def rename_target(self, old_name, new_name):
+        """Rename a native target and the names and comments that refer to it
+
+        Updates the target's name and productName, the comments after its ID
+        and its configuration list's ID, TEST_TARGET_NAME settings and
+        container proxies' remoteInfo. Returns False if no target is named
+        ``old_name``.
+        """
+        targets = [object_id for object_id in self.targets()
+                   if self.objects[object_id]["name"].value == old_name]
+        if not targets:
+            return False
+
+        for target_id in targets:
+            target = self.objects[target_id]
+            self.set(target["name"], new_name)
+            product_name = target.get("productName")
+            if product_name is not None and product_name.value == old_name:
+                self.set(product_name, new_name)
+            for comment in self.comments[target_id]:
+                if comment.value == old_name:
+                    self.set_comment(comment, new_name)
+            for comment in self.comments[target["buildConfigurationList"].value]:
+                self.set_comment(comment, comment.value.replace(f'"{old_name}"', f'"{new_name}"'))
+
+        self.set_build_setting("TEST_TARGET_NAME", lambda value: new_name if value == old_name else None)
+        for proxy_id in self.by_isa["PBXContainerItemProxy"]:
+            remote_info = self.objects[proxy_id].get("remoteInfo")
+            if remote_info is not None and remote_info.value == old_name:
+                self.set(remote_info, new_name)
+        return True
+
+def rebase_bundle_ids(project, old_base, new_base):
+    """Move every PRODUCT_BUNDLE_IDENTIFIER under ``old_base`` to ``new_base``
+
+    ``old_base`` itself and any ``old_base.suffix`` or ``old_baseSuffix``
+    identifiers keep their suffix. Returns how many values changed.
+    """
+    return project.set_build_setting(
+        "PRODUCT_BUNDLE_IDENTIFIER",
+        lambda value: new_base + value[len(old_base):] if value.startswith(old_base) else None)
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize or round-trip a project.pbxproj")
+    parser.add_argument("project", help="path to project.pbxproj")
+    parser.add_argument("--check", action="store_true", help="verify an unedited round-trip is byte-exact")
+    args = parser.parse_args()
+
+    project = PBXProject.load(args.project)
+    print(f"📦 {len(project.objects)} objects, {len(project.settings)} build setting keys")
+    for target_id in project.targets():
+        target = project.objects[target_id]
+        names = {scalar.value for _, scalar in
+                 project.build_settings("PRODUCT_BUNDLE_IDENTIFIER", project.target_configurations(target_id))}
+        print(f"🎯 {target['name'].value}: {', '.join(sorted(names))}")
+    if args.check:
+        exact = project.serialize() == project.text
+        print("✅ Round-trip is byte-exact" if exact else "❌ Round-trip differs")
+
+if __name__ == "__main__":
+    main()
@@ -4,159 +4,121 @@ Process the 1.png file and generate all required app icon sizes for iOS and macO
 Then copy them to the Xcode assets catalog
 """
 
-import os
-import shutil
+from collections import Counter
 from pathlib import Path
 
-try:
-    from PIL import Image
-except ImportError:
-    print("Installing Pillow...")
-    os.system("pip3 install Pillow")
-    from PIL import Image
-
-def generate_icon_sizes(source_path, output_dir):
-    """Generate all required icon sizes from source image"""
-
-    # Load source image
-    source = Image.open(source_path).convert("RGBA")
+from icon_export import IconExporter, mirror_files, write_if_changed
+from icon_manifest import BuildManifest, build_key, file_digest
+from icon_png import PNGOptimizer
+from icon_pyramid import QUALITY_RATIO, iter_pyramid
+from icon_source import describe, load_source
+from icon_specs import contents_json, spec_pixels, specs_for_catalog
+
+# PNG optimizer objective: bytes that one second of encoding is worth (0
+# keeps the smallest file); part of each output's build key
+PNG_SECONDS_COST = 0.0
+
+def generate_icon_sizes(source_path, output_dir, force=False, specs=None, sync=True, mirrors=()):
+    """Generate all required icon sizes from source image
+
+    ``specs`` lists the slots to fill (see icon_specs); by default they are
+    read from the Contents.json already in ``output_dir``, so only files the
+    catalog uses are rendered. Outputs whose source bytes, slot and generator
+    parameters match the build manifest in ``output_dir`` are kept as they
+    are; ``force`` rebuilds everything. With ``sync``, rebuilt files whose
+    bytes come out the same are not rewritten either, so Xcode does not
+    recompile the asset catalog for them.
+
+    Every output is also placed in each directory in ``mirrors``, cloned or
+    linked where the filesystem allows and otherwise written from the
+    encoded bytes, never encoded or copied twice.
+
+    Returns ``(filename, pixel size, spec)`` for every slot.
+    """
+    if specs is None:
+        specs = specs_for_catalog(output_dir)
 
     # Ensure output directory exists
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Icon specifications for iOS and macOS
-    # Format: (size, scale, filename, platform)
-    icon_specs = [
-        # iOS Universal (1024x1024)
-        (1024, 1, "ios-marketing-1024x1024@1x.png", "ios"),
-
-        # iOS App Icon sizes (for backward compatibility)
-        (60, 2, "iphone-60x60@2x.png", "ios"),      # 120x120
-        (60, 3, "iphone-60x60@3x.png", "ios"),      # 180x180
-        (76, 1, "ipad-76x76@1x.png", "ios"),        # 76x76
-        (76, 2, "ipad-76x76@2x.png", "ios"),        # 152x152
-        (83.5, 2, "ipad-83.5x83.5@2x.png", "ios"),  # 167x167
-
-        # macOS sizes
-        (16, 1, "mac-16x16@1x.png", "mac"),
-        (16, 2, "mac-16x16@2x.png", "mac"),
-        (32, 1, "mac-32x32@1x.png", "mac"),
-        (32, 2, "mac-32x32@2x.png", "mac"),
-        (128, 1, "mac-128x128@1x.png", "mac"),
-        (128, 2, "mac-128x128@2x.png", "mac"),
-        (256, 1, "mac-256x256@1x.png", "mac"),
-        (256, 2, "mac-256x256@2x.png", "mac"),
-        (512, 1, "mac-512x512@1x.png", "mac"),
-        (512, 2, "mac-512x512@2x.png", "mac"),
-    ]
-
-    generated_files = []
-
-    for base_size, scale, filename, platform in icon_specs:
-        # Calculate actual pixel size
-        actual_size = int(base_size * scale)
-
-        # Resize image
-        resized = source.resize((actual_size, actual_size), Image.Resampling.LANCZOS)
-
-        # Save to output directory
-        output_path = output_dir / filename
-        resized.save(output_path, "PNG", optimize=True)
-
-        generated_files.append((filename, actual_size, platform))
-        print(f"✅ Generated {filename} ({actual_size}x{actual_size})")
-
+    generated_files = [(spec.filename, spec_pixels(spec), spec) for spec in specs]
+
+    # Skip outputs whose inputs are unchanged since they were written
+    manifest = BuildManifest(output_dir)
+    source_digest = file_digest(source_path)
+    # The source is decoded only as large as the biggest slot needs; every
+    # output depends on that decode size, so it is part of each key
+    largest = max(actual_size for _, actual_size, _ in generated_files)
+    parameters = {"pyramid": QUALITY_RATIO, "png_seconds_cost": PNG_SECONDS_COST,
+                  "decode_for": largest}
+    keys = {}
+    for filename, actual_size, spec in generated_files:
+        keys[filename] = build_key(source_digest, list(spec), actual_size, parameters)
+    stale = [entry for entry in generated_files
+             if force or not manifest.is_fresh(entry[0], keys[entry[0]])]
+    mirrored = []
+
+    if stale:
+        # Load source image, skipping resolution no output needs
+        source, stats = load_source(source_path, largest)
+        print(f"📉 Loaded source {describe(stats)}")
+
+        # Build each unique pixel size once, from the nearest larger level, and
+        # encode it on the export pool while the next level is resized
+        levels = iter_pyramid(source, [actual_size for _, actual_size, _ in stale])
+        with IconExporter(encoder=PNGOptimizer(PNG_SECONDS_COST), sync=sync,
+                          mirrors=mirrors) as exporter:
+            for size, resized in levels:
+                paths = [output_dir / filename for filename, actual_size, _ in stale
+                         if actual_size == size]
+                exporter.submit(resized, paths)
+
+        reports = {path.name: (size, detail) for path, size, detail in exporter.written}
+        for filename, actual_size, _ in stale:
+            manifest.record(filename, keys[filename])
+            size, detail = reports[filename]
+            print(f"✅ Generated {filename} ({actual_size}x{actual_size}, {size:,} bytes; {detail})")
+        manifest.save()
+        print(f"🔁 {len(exporter.changed)} changed, {len(exporter.unchanged)} unchanged on disk")
+        mirrored = exporter.mirrored
+
+    if mirrors:
+        # Up-to-date outputs were not exported this run; mirror them from disk
+        stale_names = {filename for filename, _, _ in stale}
+        fresh = [output_dir / filename for filename, _, _ in generated_files
+                 if filename not in stale_names]
+        mirrored += mirror_files(fresh, mirrors, sync=sync)
+        modes = Counter(mode or "unchanged" for _, mode in mirrored)
+        print(f"🪞 Mirrored to {len(mirrors)} more folder(s): "
+              + ", ".join(f"{count} {mode}" for mode, count in sorted(modes.items())))
+
+    print(f"♻️  {len(generated_files) - len(stale)} up to date, {len(stale)} regenerated")
     return generated_files
 
-def update_contents_json(assets_dir, generated_files):
-    """Update the Contents.json file for the AppIcon asset"""
+def update_contents_json(assets_dir, generated_files, sync=True):
+    """Update the Contents.json file for the AppIcon asset
+
+    Lists exactly the slots in ``generated_files``, as returned by
+    ``generate_icon_sizes``. With ``sync`` an identical file is left alone.
+    """
     import json
 
     contents_path = assets_dir / "Contents.json"
-
-    # Create the Contents.json structure
-    contents = {
-        "images": [
-            # iOS Universal
-            {
-                "filename": "ios-marketing-1024x1024@1x.png",
-                "idiom": "universal",
-                "platform": "ios",
-                "size": "1024x1024"
-            },
-            # macOS icons
-            {
-                "filename": "mac-16x16@1x.png",
-                "idiom": "mac",
-                "scale": "1x",
-                "size": "16x16"
-            },
-            {
-                "filename": "mac-16x16@2x.png",
-                "idiom": "mac",
-                "scale": "2x",
-                "size": "16x16"
-            },
-            {
-                "filename": "mac-32x32@1x.png",
-                "idiom": "mac",
-                "scale": "1x",
-                "size": "32x32"
-            },
-            {
-                "filename": "mac-32x32@2x.png",
-                "idiom": "mac",
-                "scale": "2x",
-                "size": "32x32"
-            },
-            {
-                "filename": "mac-128x128@1x.png",
-                "idiom": "mac",
-                "scale": "1x",
-                "size": "128x128"
-            },
-            {
-                "filename": "mac-128x128@2x.png",
-                "idiom": "mac",
-                "scale": "2x",
-                "size": "128x128"
-            },
-            {
-                "filename": "mac-256x256@1x.png",
-                "idiom": "mac",
-                "scale": "1x",
-                "size": "256x256"
-            },
-            {
-                "filename": "mac-256x256@2x.png",
-                "idiom": "mac",
-                "scale": "2x",
-                "size": "256x256"
-            },
-            {
-                "filename": "mac-512x512@1x.png",
-                "idiom": "mac",
-                "scale": "1x",
-                "size": "512x512"
-            },
-            {
-                "filename": "mac-512x512@2x.png",
-                "idiom": "mac",
-                "scale": "2x",
-                "size": "512x512"
-            }
-        ],
-        "info": {
-            "author": "xcode",
-            "version": 1
-        }
-    }
+    contents = contents_json([spec for _, _, spec in generated_files])
 
     # Write the Contents.json file
-    with open(contents_path, 'w') as f:
-        json.dump(contents, f, indent=2)
-
-    print(f"✅ Updated Contents.json")
+    data = json.dumps(contents, indent=2).encode()
+    if sync:
+        changed = write_if_changed(contents_path, data)
+    else:
+        with open(contents_path, 'wb') as f:
+            f.write(data)
+        changed = True
+
+    if changed:
+        print(f"✅ Updated Contents.json ({len(contents['images'])} images)")
+    else:
+        print(f"🟰 Contents.json unchanged ({len(contents['images'])} images)")
 
 def main():
     print("🎨 Processing App Icon for Prism...")
@@ -176,9 +138,11 @@ def main():
     print(f"📁 Target directory: {assets_dir}")
     print()
 
-    # Generate all icon sizes
+    # Generate all icon sizes, also placing a copy on the Desktop for reference
+    desktop_dir = Path.home() / "Desktop" / "PrismAppIcon_Final"
     print("🔄 Generating icon sizes...")
-    generated_files = generate_icon_sizes(source_image, assets_dir)
+    print(f"📂 Also copying icons to: {desktop_dir}")
+    generated_files = generate_icon_sizes(source_image, assets_dir, mirrors=[desktop_dir])
 
     # Update Contents.json
     print("\n📝 Updating Contents.json...")
@@ -192,16 +156,6 @@ def main():
     print("3. Build and run (Cmd+R)")
     print("4. Your new icon should appear!")
 
-    # Also create a copy on Desktop for reference
-    desktop_dir = Path.home() / "Desktop" / "PrismAppIcon_Final"
-    desktop_dir.mkdir(exist_ok=True)
-
-    print(f"\n📂 Also copying icons to: {desktop_dir}")
-    for filename, _, _ in generated_files:
-        src = assets_dir / filename
-        dst = desktop_dir / filename
-        shutil.copy2(src, dst)
-
     print("✅ Complete!")
 
 if __name__ == "__main__":
@@ -4,56 +4,84 @@ Rebrand the app from Prism to a new name
 """
 
 import os
-import re
 from pathlib import Path
 
+from multi_replace import MultiReplacer
+from pbxproj import PBXProject, rebase_bundle_ids
+from swift_lexer import tokenize
+from tree_scan import SWIFT_EXTENSIONS, scan_tree
+
 def update_project_file(file_path, old_name, new_name, old_bundle, new_bundle):
-    """Update the Xcode project file"""
-    with open(file_path, 'r') as f:
-        content = f.read()
+    """Update the Xcode project file
+
+    Edits go through the parsed project (see pbxproj), so only the matching
+    build settings change and the rest of the file is kept byte-for-byte.
+    """
+    project = PBXProject.load(file_path)
 
     # Update product name
-    content = re.sub(f'PRODUCT_NAME = {old_name};', f'PRODUCT_NAME = "{new_name}";', content)
+    project.set_build_setting("PRODUCT_NAME", lambda value: new_name if value == old_name else None)
 
-    # Update bundle identifier
-    content = content.replace(f'{old_bundle}.prism', f'{new_bundle}')
-    content = content.replace(f'{old_bundle}.prismTests', f'{new_bundle}Tests')
-    content = content.replace(f'{old_bundle}.prismUITests', f'{new_bundle}UITests')
+    # Update bundle identifiers; test targets keep their suffixes
+    rebase_bundle_ids(project, f"{old_bundle}.{old_name.lower()}", new_bundle)
 
     # Update display name references
-    content = content.replace('"Prism"', f'"{new_name}"')
+    project.set_build_setting("INFOPLIST_KEY_CFBundleDisplayName",
+                              lambda value: new_name if value == old_name else None)
 
-    with open(file_path, 'w') as f:
-        f.write(content)
+    project.save(file_path)
 
     print(f"✅ Updated {file_path}")
 
-def update_swift_files(directory, old_name, new_name):
-    """Update Swift files with new branding"""
-    swift_files = Path(directory).rglob("*.swift")
-
-    replacements = [
-        ('navigationTitle("Prism")', f'navigationTitle("{new_name}")'),
-        ('"Welcome to Prism"', f'"Welcome to {new_name}"'),
-        ('"Prism"', f'"{new_name}"'),  # General string replacement
-        ('// Prism', f'// {new_name}'),  # Comments
-    ]
-
-    for swift_file in swift_files:
+def update_swift_files(directory, old_name, new_name, extensions=SWIFT_EXTENSIONS):
+    """Update Swift files with new branding
+
+    Swift files are lexed (see swift_lexer) so each rule only applies to
+    the span kinds it is meant for: ``"Prism"`` only rewrites a whole
+    string literal, never code or a comment that happens to contain it,
+    and ``// Prism`` only rewrites comments. Within a span all rules apply
+    in one pass (see multi_replace). Other file types get every rule over
+    the whole text.
+
+    The tree is prefiltered first (see tree_scan), so only files whose bytes
+    contain a pattern are decoded and rewritten. ``extensions`` widens the
+    scan beyond Swift, e.g. to tree_scan.REBRAND_EXTENSIONS.
+    """
+    rules = {
+        "string": [
+            ('"Welcome to Prism"', f'"Welcome to {new_name}"'),
+            ('"Prism"', f'"{new_name}"'),  # General string replacement
+        ],
+        "comment": [
+            ('// Prism', f'// {new_name}'),  # Comments
+        ],
+    }
+    replacers = {kind: MultiReplacer(pairs) for kind, pairs in rules.items()}
+    everywhere = MultiReplacer(pair for pairs in rules.values() for pair in pairs)
+
+    scan = scan_tree(directory, everywhere.table, extensions)
+    for path, error in scan.errors:
+        print(f"⚠️ Could not read {path}: {error}")
+
+    for swift_file in scan.matches:
         try:
-            with open(swift_file, 'r') as f:
+            with open(swift_file, 'r', encoding='utf-8') as f:
                 content = f.read()
 
             original_content = content
-            for old, new in replacements:
-                content = content.replace(old, new)
+            if swift_file.suffix == ".swift":
+                content = "".join(replacers[kind].sub(text)[0] if kind in replacers else text
+                                  for kind, text in tokenize([content]))
+            else:
+                content, _ = everywhere.sub(content)
 
             if content != original_content:
-                with open(swift_file, 'w') as f:
+                with open(swift_file, 'w', encoding='utf-8') as f:
                     f.write(content)
                 print(f"✅ Updated {swift_file.name}")
-        except Exception as e:
+        except (OSError, UnicodeDecodeError) as e:
             print(f"⚠️ Could not update {swift_file}: {e}")
+    print(f"🔎 Scanned {scan.scanned} files, {len(scan.matches)} mention {old_name} ({scan.seconds:.2f}s)")
 
 def main():
     # Configuration
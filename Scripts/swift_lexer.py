@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Streaming Swift lexer for string literals, interpolations and comments
+Splits Swift source fed in chunks into code, string, interpolation and
+comment spans in one pass, so rewrites can target only the kinds of text
+they mean to change
+"""
+
+import argparse
+import re
+import time
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+# Span kinds; joining every span's text gives back the input exactly
+KINDS = ("code", "string", "interpolation", "comment")
+
+# What ends a run of code: a comment, a (raw, multi-line) string opener or,
+# inside an interpolation, a parenthesis
+CODE_STOP = re.compile(r'//|/\*|(#*)("""|")|([()])')
+
+BLOCK_STOP = re.compile(r"/\*|\*/")
+
+# Text kept back at the end of a chunk so a delimiter split across two
+# chunks (``"`` then ``""``, ``"`` then ``#``) is seen whole
+MARGIN = 16
+
+@lru_cache(maxsize=None)
+def _string_stop(hashes, multiline):
+    """Regex for what matters inside a string: escapes (group 1 set for an
+    interpolation), the closing delimiter and, for one-line strings, a
+    newline that means the literal was never closed"""
+    escape = re.escape("\\" + "#" * hashes)
+    close = re.escape(('"""' if multiline else '"') + "#" * hashes)
+    newline = "" if multiline else r"|\n"
+    return re.compile(rf"{escape}(?:(\()|.)|{close}{newline}", re.DOTALL)
+
+class SwiftLexer:
+    """Incremental lexer: ``feed`` text as it is read, then ``close``
+
+    Both return ``(kind, text)`` spans. String spans keep their delimiters
+    (``"Prism"``, ``"Hi \\(``, ``) there"``), comment spans keep ``//`` or
+    ``/* */``, and the code inside ``\\(...)`` is an interpolation span.
+    Code is flushed at line ends as it streams, while each comment or
+    string segment is returned whole, so memory stays bounded by the chunk
+    size plus the longest single literal or comment.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._start = 0  # Start of the span being built
+        self._pos = 0  # Where scanning resumes
+        # Open constructs: ["code", None] at the bottom, then
+        # ["interpolation", paren depth], ["string", regex] or ["comment", depth]
+        self._stack = [["code", None]]
+
+    def feed(self, text):
+        """Lex more text; returns the spans it completed"""
+        self._buffer += text
+        return self._lex(final=False)
+
+    def close(self):
+        """Lex what is left; unterminated literals and comments end here"""
+        spans = self._lex(final=True)
+        if self._start < len(self._buffer):
+            spans.append((self._stack[-1][0], self._buffer[self._start:]))
+        self._buffer = ""
+        self._start = self._pos = 0
+        self._stack = [["code", None]]
+        return spans
+
+    def _emit(self, spans, kind, end):
+        if end > self._start:
+            spans.append((kind, self._buffer[self._start:end]))
+            self._start = end
+
+    def _lex(self, final):
+        text = self._buffer
+        limit = len(text) if final else len(text) - MARGIN
+        spans = []
+        stack = self._stack
+        pos = self._pos
+
+        while True:
+            frame = stack[-1]
+            kind = frame[0]
+
+            if kind == "code" or kind == "interpolation":
+                match = CODE_STOP.search(text, pos)
+                if match is None or match.end() > limit:
+                    # Flush whole lines of code; the rest may start a delimiter
+                    pos = max(pos, limit) if match is None else match.start()
+                    end = text.rfind("\n", self._start, pos) + 1
+                    if end:
+                        self._emit(spans, kind, end)
+                    break
+                token = match.group()
+                start = match.start()
+                if match.group(3):
+                    if kind == "interpolation":
+                        if token == "(":
+                            frame[1] += 1
+                        elif frame[1]:
+                            frame[1] -= 1
+                        else:
+                            self._emit(spans, kind, start)
+                            stack.pop()  # Back in the string, which owns the ")"
+                    pos = match.end()
+                elif token == "//":
+                    newline = text.find("\n", start)
+                    if newline == -1 and not final:
+                        pos = start
+                        break
+                    end = len(text) if newline == -1 else newline
+                    self._emit(spans, kind, start)
+                    self._emit(spans, "comment", end)
+                    pos = end
+                elif token == "/*":
+                    self._emit(spans, kind, start)
+                    stack.append(["comment", 1])
+                    pos = match.end()
+                else:
+                    self._emit(spans, kind, start)
+                    stack.append(["string", _string_stop(len(match.group(1)), match.group(2) == '"""')])
+                    pos = match.end()
+
+            elif kind == "string":
+                match = frame[1].search(text, pos)
+                if match is None or match.end() > limit:
+                    pos = max(pos, limit) if match is None else match.start()
+                    break
+                if match.group().startswith("\\"):
+                    if match.group(1):
+                        self._emit(spans, "string", match.end())
+                        stack.append(["interpolation", 0])
+                    pos = match.end()
+                else:
+                    end = match.end() - (match.group() == "\n")
+                    self._emit(spans, "string", end)
+                    stack.pop()
+                    pos = end
+
+            else:
+                match = BLOCK_STOP.search(text, pos)
+                if match is None or match.end() > limit:
+                    pos = max(pos, limit) if match is None else match.start()
+                    break
+                frame[1] += 1 if match.group() == "/*" else -1
+                pos = match.end()
+                if not frame[1]:
+                    self._emit(spans, "comment", pos)
+                    stack.pop()
+
+        # Drop what has been returned
+        self._buffer = text[self._start:]
+        self._pos = max(pos - self._start, 0)
+        self._start = 0
+        return spans
+
+def tokenize(chunks):
+    """Yield ``(kind, text)`` spans for an iterable of source text chunks"""
+    lexer = SwiftLexer()
+    for chunk in chunks:
+        yield from lexer.feed(chunk)
+    yield from lexer.close()
+
+def tokenize_file(path, chunk_size=64 * 1024):
+    """Yield ``(kind, text)`` spans for a Swift file, read in chunks"""
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from tokenize(iter(lambda: f.read(chunk_size), ""))
+
+def main():
+    parser = argparse.ArgumentParser(description="Lex Swift sources and summarize their spans")
+    parser.add_argument("paths", nargs="+", help="Swift files or directories")
+    parser.add_argument("--kind", choices=KINDS, help="print every span of this kind")
+    args = parser.parse_args()
+
+    files = []
+    for path in map(Path, args.paths):
+        files.extend(sorted(path.rglob("*.swift")) if path.is_dir() else [path])
+
+    start = time.perf_counter()
+    counts = Counter()
+    size = 0
+    for path in files:
+        for kind, text in tokenize_file(path):
+            counts[kind] += 1
+            size += len(text)
+            if kind == args.kind:
+                print(f"{path.name}: {text!r}")
+    elapsed = time.perf_counter() - start
+
+    print(f"🔤 {len(files)} files, {size:,} chars in {elapsed:.3f}s")
+    print("   " + ", ".join(f"{kind}: {counts[kind]}" for kind in KINDS))
+
+if __name__ == "__main__":
+    main()
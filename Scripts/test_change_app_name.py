@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Tests for change_app_name's indexed repeat renames
+Run with ``python -m pytest Scripts``
+"""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from brand_index import INDEX_NAME
+from change_app_name import update_app_name
+
+REPO = Path(__file__).resolve().parent.parent
+FILES = ("Prysm/Constants/AppConfig.swift", "Prysm.xcodeproj/project.pbxproj")
+
+def _project(root):
+    for name in FILES:
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(REPO / name, root / name)
+    return root
+
+def _contents(root):
+    return {name: (root / name).read_bytes() for name in FILES}
+
+# Names that also occur in the project's boilerplate or target suffixes
+@pytest.mark.parametrize("first", ["Target", "Build", "Test", "Tests", "configuration"])
+def test_indexed_rename_matches_a_fresh_rename(tmp_path, first):
+    fresh = _project(tmp_path / "fresh")
+    update_app_name("Luma AI", project_root=fresh)
+
+    indexed = _project(tmp_path / "indexed")
+    update_app_name(first, project_root=indexed)
+    update_app_name("Luma AI", project_root=indexed)
+
+    assert (indexed / INDEX_NAME).exists()
+    assert _contents(indexed) == _contents(fresh)
+
+def test_indexed_renames_patch_in_place(tmp_path, capsys):
+    root = _project(tmp_path / "project")
+    update_app_name("Spectrum AI", project_root=root)
+    update_app_name("Luma AI", project_root=root)
+    assert capsys.readouterr().out.count("⚡ Patched") == 2
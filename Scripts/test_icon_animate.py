@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for icon_animate's streaming writers
+Run with ``python -m pytest Scripts``
+"""
+
+import numpy as np
+from PIL import Image
+
+from icon_animate import save_animation
+
+RED = (255, 0, 0, 255)
+GREEN = (0, 255, 0, 255)
+BLUE = (0, 0, 255, 255)
+
+def _frame(square, corner):
+    pixels = np.zeros((16, 16, 4), dtype=np.uint8)
+    if square:
+        pixels[2:6, 2:6] = square
+    pixels[10:14, 10:14] = corner
+    return Image.fromarray(pixels)
+
+def _decoded(path):
+    with Image.open(path) as image:
+        frames = []
+        for index in range(image.n_frames):
+            image.seek(index)
+            frames.append(np.asarray(image.convert('RGBA')))
+        return frames
+
+def test_gif_clears_pixels_outside_the_previous_rectangle(tmp_path):
+    # Frame 1 only changes the corner, so frame 2 clearing the square must
+    # not rely on frame 1's rectangle to dispose of it
+    frames = [_frame(RED, GREEN), _frame(RED, BLUE), _frame(None, BLUE)]
+    path = tmp_path / "cleared.gif"
+    save_animation(frames, path)
+
+    decoded = _decoded(path)
+    assert len(decoded) == 3
+    assert tuple(decoded[1][3, 3]) == RED
+    assert decoded[2][3, 3, 3] == 0
+    assert tuple(decoded[2][11, 11]) == BLUE
+
+def test_formats_round_trip_every_frame(tmp_path):
+    frames = [_frame(RED, GREEN), _frame(RED, BLUE), _frame(None, BLUE), _frame(RED, GREEN)]
+    for suffix in (".apng", ".gif"):
+        path = tmp_path / f"frames{suffix}"
+        save_animation(frames, path)
+        for expected, actual in zip(frames, _decoded(path)):
+            assert np.array_equal(np.asarray(expected), actual), suffix
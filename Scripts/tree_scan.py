@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Parallel, prefiltered source tree scanning for rebrand operations
+Walks a tree for the file types a rebrand touches and checks each file's raw
+bytes for any brand token on a thread pool, so only files that actually
+mention a token are decoded and rewritten
+"""
+
+import argparse
+import mmap
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from multi_replace import trie_pattern
+
+SWIFT_EXTENSIONS = (".swift",)
+
+# Everything a rebrand may need to touch
+REBRAND_EXTENSIONS = (".swift", ".plist", ".strings", ".xcstrings", ".md", ".pbxproj")
+
+# Directories that only hold build output, dependencies or VCS data
+SKIP_DIRS = {".git", ".build", "build", "DerivedData", "Pods", "Carthage", "node_modules", "__pycache__"}
+
+# Files at least this large are memory-mapped instead of read
+MMAP_BYTES = 64 * 1024
+
+# Up to this many distinct needles are searched with bytes.find, which is
+# memchr-fast; more go through one trie regex, which scans each byte once
+FIND_NEEDLES = 8
+
+# Files handed to a scanner thread at a time; batching keeps the pool's
+# per-task overhead small next to reading a typical source file
+BATCH_FILES = 64
+
+def iter_files(root, extensions=SWIFT_EXTENSIONS):
+    """Yield paths under ``root`` whose suffix is in ``extensions``, skipping SKIP_DIRS"""
+    pending = [root]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        pending.append(entry.path)
+                elif entry.name.endswith(extensions) and entry.is_file():
+                    yield Path(entry.path)
+
+def token_regex(tokens):
+    """Compile a bytes regex matching the UTF-8 encoding of any token"""
+    # Latin-1 maps bytes to code points one to one, so the str trie
+    # pattern converts back to an exact bytes pattern
+    encoded = [token.encode("utf-8").decode("latin-1") for token in tokens]
+    return re.compile(trie_pattern(encoded).encode("latin-1"))
+
+def token_matcher(tokens):
+    """Return ``contains(data)``, true if bytes or an mmap hold any token
+
+    A token that contains another one is dropped, since the shorter one
+    matches wherever it would. Few needles are searched one ``find`` at a
+    time; many go through ``token_regex``.
+    """
+    needles = sorted({token.encode("utf-8") for token in tokens}, key=len)
+    if not needles or not needles[0]:
+        raise ValueError("tokens need at least one non-empty string")
+    minimal = []
+    for needle in needles:
+        if not any(shorter in needle for shorter in minimal):
+            minimal.append(needle)
+
+    if len(minimal) > FIND_NEEDLES:
+        search = token_regex(needle.decode("utf-8") for needle in minimal).search
+        return lambda data: search(data) is not None
+    return lambda data: any(data.find(needle) != -1 for needle in minimal)
+
+def file_matches(path, contains):
+    """Whether the file's bytes contain a token, without decoding it"""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return False
+        if size < MMAP_BYTES:
+            return contains(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return contains(data)
+
+class ScanResult:
+    """Files that mention a token, plus what the scan cost"""
+
+    def __init__(self):
+        self.matches = []
+        self.errors = []
+        self.scanned = 0
+        self.seconds = 0.0
+
+    def __repr__(self):
+        return (f"ScanResult({len(self.matches)} of {self.scanned} files matched, "
+                f"{len(self.errors)} errors, {self.seconds:.3f}s)")
+
+def scan_tree(root, tokens, extensions=SWIFT_EXTENSIONS, workers=None):
+    """Find the files under ``root`` that contain any of ``tokens``
+
+    Files are prefiltered on a thread pool (file reads and regex searches
+    over bytes release the GIL). Unreadable files are collected in
+    ``errors`` as ``(path, exception)`` instead of stopping the scan.
+    """
+    start = time.perf_counter()
+    contains = token_matcher(tokens)
+    result = ScanResult()
+
+    def check(paths):
+        results = []
+        for path in paths:
+            try:
+                results.append((path, file_matches(path, contains), None))
+            except OSError as e:
+                results.append((path, False, e))
+        return results
+
+    def batches():
+        batch = []
+        for path in iter_files(root, extensions):
+            batch.append(path)
+            if len(batch) == BATCH_FILES:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    workers = workers or min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tree-scan") as executor:
+        for results in executor.map(check, batches()):
+            for path, matched, error in results:
+                result.scanned += 1
+                if error is not None:
+                    result.errors.append((path, error))
+                elif matched:
+                    result.matches.append(path)
+
+    result.seconds = time.perf_counter() - start
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="List files that mention any brand token")
+    parser.add_argument("root", help="directory to scan")
+    parser.add_argument("tokens", nargs="+", help="brand tokens to look for")
+    parser.add_argument("--all-types", action="store_true",
+                        help=f"scan {', '.join(REBRAND_EXTENSIONS)} instead of only Swift")
+    parser.add_argument("--workers", type=int, help="scanner threads")
+    args = parser.parse_args()
+
+    extensions = REBRAND_EXTENSIONS if args.all_types else SWIFT_EXTENSIONS
+    result = scan_tree(args.root, args.tokens, extensions, args.workers)
+    for path in result.matches:
+        print(path)
+    for path, error in result.errors:
+        print(f"⚠️ Could not read {path}: {error}")
+    print(f"🔎 {len(result.matches)} of {result.scanned} files match ({result.seconds:.3f}s)")
+
+if __name__ == "__main__":
+    main()